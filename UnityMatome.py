@@ -9,11 +9,30 @@ bl_info = {
 }
 
 import bpy
+import bmesh
 import os
 import re
+import sys
+import argparse
+import csv
+import json
+import shutil
+import subprocess
+import tempfile
+import threading
+import zipfile
+import hashlib
+import struct
+import zlib
+from array import array
 import math
+import time
+from collections import deque
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from mathutils import Vector
+import numpy as np
+from mathutils import Matrix, Vector
 
 # =========================================================
 # 共通ユーティリティ
@@ -50,6 +69,22 @@ def ensure_object_mode():
         except:
             pass
 
+def run_steps(steps):
+    """ステップ用ジェネレーターを最後まで同期実行し、その戻り値を返す"""
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        return stop.value
+
+def build_children_index(objects):
+    """親→子の対応表を一度だけ作る (obj.childrenは毎回全オブジェクトを走査するため)"""
+    index = {}
+    for o in objects:
+        if o.parent:
+            index.setdefault(o.parent, []).append(o)
+    return index
+
 # =========================================================
 # アドオン設定
 # =========================================================
@@ -62,34 +97,150 @@ class FU_AddonPreferences(bpy.types.AddonPreferences):
         subtype='DIR_PATH',
         default="//"
     )
+    export_workers: bpy.props.IntProperty(
+        name="並列ワーカー数",
+        description="並列FBX書き出しで起動するバックグラウンドBlenderの数",
+        default=max(1, min(8, (os.cpu_count() or 2) - 1)),
+        min=1,
+        max=64
+    )
+    unity_assets_dir: bpy.props.StringProperty(
+        name="Unityコピー先",
+        description="書き出したFBXをコピーするUnityプロジェクト内のフォルダ (例: Assets/Models)",
+        subtype='DIR_PATH',
+        default=""
+    )
 
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "export_base_dir")
+        layout.prop(self, "export_workers")
+        layout.prop(self, "unity_assets_dir")
 
 # =========================================================
 # 1) ToUnity
 # =========================================================
+def unity_bake_matrix(obj):
+    """To Unityでメッシュに焼き込む行列 (100倍スケール → X軸-90°回転)"""
+    rot = obj.rotation_euler.copy()
+    rot[0] = math.radians(-90)
+    return rot.to_matrix().to_4x4() @ Matrix.Scale(100.0, 4)
+
+def _matrix_key(matrix):
+    return tuple(round(v, 6) for row in matrix for v in row)
+
+def bake_unity_transforms(objects):
+    """transform_applyを使わずにTo Unity変換を一括で適用する
+
+    共有メッシュは焼き込み行列ごとに一度だけ変換し、選択・アクティブ・モードは変更しない。
+    戻り値: (処理したオブジェクト数, 変換したメッシュ数, スキップ一覧, フェーズ別の秒数)
+    """
+    timings = {}
+    skipped = []
+
+    # 収集: (メッシュ, 焼き込み行列) ごとにユーザーをまとめる
+    t = time.perf_counter()
+    groups = {}
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        if obj.mode != 'OBJECT':
+            skipped.append((obj.name, "Not in Object Mode"))
+            continue
+        if obj.library or obj.data.library:
+            skipped.append((obj.name, "Linked data"))
+            continue
+        if obj.rotation_mode in {'QUATERNION', 'AXIS_ANGLE'}:
+            skipped.append((obj.name, "Non-Euler rotation"))
+            continue
+        matrix = unity_bake_matrix(obj)
+        entry = groups.setdefault((obj.data, _matrix_key(matrix)), (matrix, []))
+        entry[1].append(obj)
+    children_index = build_children_index(bpy.data.objects)
+    timings["収集"] = time.perf_counter() - t
+
+    # メッシュへの焼き込み: データブロックごとに1回だけ
+    t = time.perf_counter()
+    baked = set()
+    for (mesh, _key), (matrix, users) in groups.items():
+        if mesh in baked or mesh.users > len(users):
+            # このグループ以外のユーザー (行列の異なるユーザー・対象外のユーザー) が残っている場合は
+            # 複製して切り離す。先に切り離したグループの分は mesh.users から減っている
+            mesh = mesh.copy()
+            for obj in users:
+                obj.data = mesh
+        baked.add(mesh)
+        mesh.transform(matrix, shape_keys=True)
+        mesh.update()
+    timings["ベイク"] = time.perf_counter() - t
+
+    # オブジェクト側の補正トランスフォーム (子のワールド位置は親逆行列で維持)
+    t = time.perf_counter()
+    processed = 0
+    for _matrix, users in groups.values():
+        for obj in users:
+            old_basis = obj.matrix_basis.copy()
+            obj.scale = (0.01, 0.01, 0.01)
+            obj.rotation_euler = (math.radians(90), 0.0, 0.0)
+            try:
+                correction = obj.matrix_basis.inverted() @ old_basis
+            except ValueError:
+                correction = None
+            if correction is not None:
+                for child in children_index.get(obj, ()):
+                    if child.parent_type == 'OBJECT':
+                        child.matrix_parent_inverse = correction @ child.matrix_parent_inverse
+            processed += 1
+    timings["変換"] = time.perf_counter() - t
+
+    return processed, len(baked), skipped, timings
+
+def format_timings(timings):
+    return ", ".join(f"{name} {sec:.2f}s" for name, sec in timings.items())
+
 class FORUNITY_OT_to_unity(bpy.types.Operator):
     """Apply transforms for Unity export"""
     bl_idname = "forunity.to_unity"
     bl_label = "To Unity"
     bl_options = {'REGISTER', 'UNDO'}
 
-    def execute(self, context):
-        orig_mode = bpy.context.mode
-        orig_selected = list(context.selected_objects)
-        orig_active = context.view_layer.objects.active
+    method: bpy.props.EnumProperty(
+        name="方式",
+        items=[
+            ('MATRIX', "行列ベイク (高速)", "メッシュデータへ直接行列を焼き込み、共有メッシュは一度だけ処理"),
+            ('OPERATOR', "transform_apply", "従来どおりオブジェクトごとにtransform_applyを実行"),
+        ],
+        default='MATRIX'
+    )
 
-        targets = [obj for obj in orig_selected if obj.type == 'MESH']
+    def execute(self, context):
+        targets = [obj for obj in context.selected_objects if obj.type == 'MESH']
         if not targets:
             self.report({'WARNING'}, "メッシュオブジェクトが選択されていません")
             return {'CANCELLED'}
 
+        if self.method == 'MATRIX':
+            return self._execute_matrix(targets)
+        return self._execute_operator(context, targets)
+
+    def _execute_matrix(self, targets):
+        processed, meshes, skipped, timings = bake_unity_transforms(targets)
+        for name, reason in skipped:
+            self.report({'WARNING'}, f"{name}: スキップ ({reason})")
+        self.report({'INFO'}, f"{processed}個のメッシュオブジェクトを処理しました "
+                              f"(メッシュ {meshes}個 / {format_timings(timings)})")
+        return {'FINISHED'}
+
+    def _execute_operator(self, context, targets):
+        orig_mode = bpy.context.mode
+        orig_selected = list(context.selected_objects)
+        orig_active = context.view_layer.objects.active
+
         if orig_mode != 'OBJECT':
             bpy.ops.object.mode_set(mode='OBJECT')
 
         processed = 0
+        t = time.perf_counter()
         try:
             for obj in targets:
                 for o in context.selected_objects:
@@ -119,7 +270,8 @@ class FORUNITY_OT_to_unity(bpy.types.Operator):
                 except:
                     pass
 
-        self.report({'INFO'}, f"{processed}個のメッシュオブジェクトを処理しました")
+        self.report({'INFO'}, f"{processed}個のメッシュオブジェクトを処理しました "
+                              f"(transform_apply {time.perf_counter() - t:.2f}s)")
         return {'FINISHED'}
 
 # =========================================================
@@ -150,6 +302,1086 @@ class FORUNITY_OT_set_export_dir(bpy.types.Operator):
         self.report({'INFO'}, f"書き出し先を設定: {prefs.export_base_dir}")
         return {'FINISHED'}
 
+FBX_OBJECT_TYPES = ('EMPTY', 'MESH', 'ARMATURE', 'LIGHT')
+
+def gather_fbx_settings(scene):
+    """シーンのforunity_*設定からexport_scene.fbxの引数を組み立てる (JSON化できる値のみ)"""
+    export_anim = scene.forunity_export_animation
+    return {
+        "add_leaf_bones": False,
+        "armature_nodetype": 'NULL',
+        "apply_unit_scale": True,
+        "bake_space_transform": False,
+        "object_types": list(FBX_OBJECT_TYPES),
+        "use_mesh_modifiers": True,
+        "mesh_smooth_type": 'FACE',
+        "use_tspace": False,
+        "use_custom_props": False,
+        "path_mode": 'AUTO',
+        "embed_textures": False,
+        "apply_scale_options": 'FBX_SCALE_UNITS',
+        "bake_anim": export_anim,
+        "bake_anim_use_all_bones": scene.forunity_key_all_bones if export_anim else True,
+        "bake_anim_use_nla_strips": scene.forunity_nla_strips if export_anim else True,
+        "bake_anim_use_all_actions": scene.forunity_all_actions if export_anim else True,
+        "bake_anim_force_startend_keying": scene.forunity_force_start_end_keying if export_anim else True,
+        "bake_anim_step": scene.forunity_sampling_rate if export_anim else 1.0,
+        "bake_anim_simplify_factor": scene.forunity_simplify if export_anim else 1.0,
+    }
+
+def collect_unit_objects(obj, include_children, include_parent_armature, children_index, members=()):
+    """書き出しユニットに含まれるオブジェクト (子孫・親アーマチュア込み)
+
+    members: アーマチュア単位のユニットでは、objがアーマチュアでmembersがまとめるメッシュ。
+    この場合アーマチュア自身の子孫は展開せず、members (と、その子孫) だけを含める。
+    """
+    if members:
+        objs = [obj]
+        for member in members:
+            objs.extend(collect_unit_objects(member, include_children, False, children_index))
+        return list(dict.fromkeys(objs))
+    objs = [obj]
+    if include_children:
+        stack = list(children_index.get(obj, ()))
+        while stack:
+            child = stack.pop()
+            objs.append(child)
+            stack.extend(children_index.get(child, ()))
+    if include_parent_armature and obj.parent and obj.parent.type == 'ARMATURE':
+        objs.append(obj.parent)
+    return objs
+
+def group_units_by_armature(sel):
+    """同じアーマチュアを親に持つ選択メッシュを、アーマチュアをルートにした1ユニットにまとめる
+
+    標準エクスポーターはFBXごとにアクションをベイクし直すため、リグを共有する
+    メッシュをまとめて書き出せば各アクションのベイクは1回で済む。
+    メッシュが1つだけのリグは従来どおりメッシュ単位のまま。
+    戻り値: (ユニットのルート一覧, {アーマチュア名: [メンバー名]})
+    """
+    order = {}
+    groups = {}
+    for obj in sel:
+        parent = obj.parent
+        if obj.type == 'MESH' and parent and parent.type == 'ARMATURE':
+            groups.setdefault(parent.name, []).append(obj.name)
+            order.setdefault(parent, None)
+        else:
+            order.setdefault(obj, None)
+    selected = set(sel)
+    roots = []
+    for obj in order:
+        members = groups.get(obj.name) if obj.type == 'ARMATURE' else None
+        if members is not None and len(members) == 1 and obj not in selected:
+            roots.append(bpy.data.objects[members[0]])
+            del groups[obj.name]
+        else:
+            roots.append(obj)
+    return roots, groups
+
+def unit_members(obj, options):
+    """options["groups"] からアーマチュア単位ユニットのメンバーを引く (通常ユニットは空)"""
+    names = options.get("groups", {}).get(obj.name, ())
+    return [bpy.data.objects[name] for name in names if name in bpy.data.objects]
+
+def export_fbx_unit(context, obj, fpath, fbx_settings, unit_objs, options):
+    """ユニットのオブジェクトだけを選択してFBXに書き出す
+
+    ジョブキューではタイマーの合間にユーザーが選択を変えられるので、書き出しの直前に
+    ビューレイヤーの選択を解除してからユニット分だけを選択し、書き出し後に解除する。
+    options["native_writer"] が有効で静的メッシュのみのユニットはネイティブライターで書き出す。
+    options["native_benchmark"] も有効なら、同じユニットを標準エクスポーターで一時ファイルにも書き出して
+    stats["stock_seconds"] に所要時間を残す。
+    戻り値: (フェーズ別の秒数, 統計)
+    """
+    timings = {}
+    stats = {"writer": "stock"}
+    move_to_origin = options["move_to_origin"]
+    if options.get("native_writer") and native_fbx_unsupported_reason(unit_objs, fbx_settings) is None:
+        t = time.perf_counter()
+        stats["vertices"], stats["triangles"] = write_static_fbx(
+            fpath, context.evaluated_depsgraph_get(), context.scene, unit_objs, move_to_origin)
+        timings["export"] = time.perf_counter() - t
+        stats["writer"] = "native"
+        for key, value in unit_stats(context.evaluated_depsgraph_get(), unit_objs, fbx_settings, fpath).items():
+            stats.setdefault(key, value)
+        if options.get("native_benchmark"):
+            fd, tmp_path = tempfile.mkstemp(suffix=".fbx", prefix="forunity_bench_")
+            os.close(fd)
+            try:
+                stock_timings, _ = export_fbx_unit(context, obj, tmp_path, fbx_settings, unit_objs,
+                                                   dict(options, native_writer=False, native_benchmark=False))
+                stats["stock_seconds"] = stock_timings["export"]
+            finally:
+                os.remove(tmp_path)
+        return timings, stats
+
+    t = time.perf_counter()
+    for o in list(context.view_layer.objects.selected):
+        o.select_set(False)
+    for o in unit_objs:
+        try:
+            o.select_set(True)
+        except RuntimeError:
+            pass  # ビューレイヤーに無いオブジェクト
+    armature = obj.parent if obj.parent in unit_objs and obj.parent.type == 'ARMATURE' else None
+    context.view_layer.objects.active = armature or obj
+    timings["select"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    moved_objects = {}
+    if move_to_origin:
+        targets_to_move = [obj]
+        if armature:
+            targets_to_move.append(armature)
+
+        for target in targets_to_move:
+            if target not in moved_objects:
+                moved_objects[target] = target.matrix_world.copy()
+                new_matrix = target.matrix_world.copy()
+                new_matrix.translation = Vector((0.0, 0.0, 0.0))
+                target.matrix_world = new_matrix
+    timings["origin"] = time.perf_counter() - t
+
+    settings = dict(fbx_settings)
+    settings["object_types"] = set(settings["object_types"])
+    try:
+        t = time.perf_counter()
+        bpy.ops.export_scene.fbx(filepath=fpath, use_selection=True, **settings)
+        timings["export"] = time.perf_counter() - t
+    finally:
+        t = time.perf_counter()
+        for target, matrix in moved_objects.items():
+            target.matrix_world = matrix
+        timings["origin"] += time.perf_counter() - t
+        t = time.perf_counter()
+        for o in unit_objs:
+            try:
+                o.select_set(False)
+            except RuntimeError:
+                pass
+        timings["select"] += time.perf_counter() - t
+    stats.update(unit_stats(context.evaluated_depsgraph_get(), unit_objs, fbx_settings, fpath))
+    return timings, stats
+
+def iter_export_fbx_units(context, units, fbx_settings, options, on_result=None):
+    """ユニットを順に書き出し、最後に元の選択・アクティブを戻す
+
+    1ユニットごとに (完了数, 総数) をyieldする。途中でclose()されても選択は元に戻る。
+    units: [(オブジェクト, 出力パス)]
+    options: include_children / include_parent_armature / move_to_origin / native_writer
+    on_result: ユニットが終わるたびに結果辞書を渡して呼ぶ関数 (書き出し後処理用)
+    戻り値: 結果辞書のリスト (object, filepath, ok, error, seconds, timings, stats)
+    """
+    view_layer = context.view_layer
+    orig_selected = list(context.selected_objects)
+    orig_active = view_layer.objects.active
+    children_index = build_children_index(view_layer.objects)
+    for o in orig_selected:
+        o.select_set(False)
+
+    results = []
+    try:
+        for obj, fpath in units:
+            result = {"object": obj.name, "filepath": fpath, "ok": False, "error": "", "timings": {}, "stats": {}}
+            t = time.perf_counter()
+            try:
+                unit_objs = collect_unit_objects(obj, options["include_children"],
+                                                 options["include_parent_armature"], children_index,
+                                                 unit_members(obj, options))
+                result["timings"], result["stats"] = export_fbx_unit(context, obj, fpath, fbx_settings,
+                                                                     unit_objs, options)
+                result["ok"] = True
+            except Exception as e:
+                result["error"] = str(e)
+            result["seconds"] = time.perf_counter() - t
+            results.append(result)
+            if on_result:
+                on_result(result)
+            yield len(results), len(units)
+    finally:
+        for o in context.selected_objects:
+            o.select_set(False)
+        for o in orig_selected:
+            o.select_set(True)
+        view_layer.objects.active = orig_active
+    return results
+
+def export_fbx_units(context, units, fbx_settings, options):
+    return run_steps(iter_export_fbx_units(context, units, fbx_settings, options))
+
+# ---------------------------------------------------------
+# 2-3) 静的メッシュ用ネイティブFBXライター
+# ---------------------------------------------------------
+# export_scene.fbx (axis_forward='-Z', axis_up='Y', FBX_SCALE_UNITS) と同じ軸・単位で
+# バイナリFBX 7.4を直接書く。ジオメトリはforeach_getでまとめて取得し、zlib圧縮配列で出力する。
+_FBX_VERSION = 7400
+_FBX_HEAD_MAGIC = b"Kaydara FBX Binary\x20\x20\x00\x1a\x00"
+_FBX_SENTINEL = b"\x00" * 13
+# FileId/CreationTimeとフッターの組はBlender標準エクスポーターと同じ固定値を使う
+_FBX_FILE_ID = b"\x28\xb3\x2a\xeb\xb6\x24\xcc\xc2\xbf\xc8\xb0\x2a\xa9\x2b\xfc\xf1"
+_FBX_TIME_ID = "1970-01-01 10:00:00:000"
+_FBX_FOOT_ID = b"\xfa\xbc\xab\x09\xd0\xc8\xd4\x66\xb1\x76\xfb\x83\x1c\xf7\x26\x7e"
+_FBX_FOOT_MAGIC = b"\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b"
+# Blender (Z-up, -Y forward) → FBX (Y-up, Z forward)
+_FBX_GLOBAL_MATRIX = Matrix(((1, 0, 0, 0), (0, 0, 1, 0), (0, -1, 0, 0), (0, 0, 0, 1)))
+_FBX_ARRAY_CODES = {"f8": b"d", "f4": b"f", "i4": b"i", "i8": b"l", "b1": b"b"}
+
+class _Int64(int):
+    """FBXのint64 (L) プロパティとして書き出す整数"""
+
+def _fbx_prop(value):
+    if isinstance(value, bool):
+        return b"C" + struct.pack("<?", value)
+    if isinstance(value, _Int64):
+        return b"L" + struct.pack("<q", value)
+    if isinstance(value, int):
+        return b"I" + struct.pack("<i", value)
+    if isinstance(value, float):
+        return b"D" + struct.pack("<d", value)
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        return b"S" + struct.pack("<I", len(data)) + data
+    if isinstance(value, bytes):
+        return b"R" + struct.pack("<I", len(value)) + value
+    arr = np.ascontiguousarray(value)
+    code = _FBX_ARRAY_CODES[arr.dtype.str[1:]]
+    raw = arr.astype(arr.dtype.newbyteorder("<"), copy=False).tobytes()
+    comp = zlib.compress(raw, 1)
+    return code + struct.pack("<3I", len(arr), 1, len(comp)) + comp
+
+class _FBXElem:
+    """バイナリFBXのノード (プロパティはエンコード済みで保持)"""
+    __slots__ = ("id", "props", "elems")
+
+    def __init__(self, elem_id, *props):
+        self.id = elem_id.encode("ascii")
+        self.props = [_fbx_prop(p) for p in props]
+        self.elems = []
+
+    def add(self, elem_id, *props):
+        elem = _FBXElem(elem_id, *props)
+        self.elems.append(elem)
+        return elem
+
+    def add_props70(self, props):
+        p70 = self.add("Properties70")
+        for prop in props:
+            p70.add("P", *prop)
+        return p70
+
+def _fbx_write_elem(out, base, elem, is_last):
+    start = len(out)
+    out += struct.pack("<3I", 0, len(elem.props), sum(len(p) for p in elem.props))
+    out += bytes((len(elem.id),)) + elem.id
+    for p in elem.props:
+        out += p
+    _fbx_write_children(out, base, elem, is_last)
+    out[start:start + 4] = struct.pack("<I", base + len(out))
+
+def _fbx_write_children(out, base, elem, is_last):
+    if elem.elems:
+        last = elem.elems[-1]
+        for child in elem.elems:
+            _fbx_write_elem(out, base, child, child is last)
+        out += _FBX_SENTINEL
+    elif not elem.props and not is_last:
+        out += _FBX_SENTINEL
+
+def _fbx_write_file(fpath, root):
+    head = _FBX_HEAD_MAGIC + struct.pack("<I", _FBX_VERSION)
+    out = bytearray()
+    _fbx_write_children(out, len(head), root, False)
+    out += _FBX_FOOT_ID + b"\x00" * 4
+    ofs = len(head) + len(out)
+    out += b"\x00" * ((((ofs + 15) & ~15) - ofs) or 16)
+    out += struct.pack("<I", _FBX_VERSION) + b"\x00" * 120 + _FBX_FOOT_MAGIC
+    tmp = fpath + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(head)
+        f.write(out)
+    os.replace(tmp, fpath)
+
+def native_fbx_unsupported_reason(unit_objs, fbx_settings):
+    """ネイティブライターで扱えないユニットなら理由を返す (Noneなら対応)"""
+    unit = set(unit_objs)
+    for obj in unit_objs:
+        if obj.type not in {'MESH', 'EMPTY'}:
+            return f"{obj.name}: {obj.type}"
+        if obj.parent in unit and obj.parent_type != 'OBJECT':
+            return f"{obj.name}: parent type {obj.parent_type}"
+        if obj.type == 'EMPTY' and obj.instance_type != 'NONE':
+            return f"{obj.name}: instancing"
+        anim = obj.animation_data
+        if fbx_settings["bake_anim"] and anim and (anim.action or len(anim.nla_tracks) or len(anim.drivers)):
+            return f"{obj.name}: animation"
+        if obj.type == 'MESH':
+            if obj.data.shape_keys:
+                return f"{obj.name}: shape keys"
+            if any(mod.type == 'ARMATURE' for mod in obj.modifiers):
+                return f"{obj.name}: armature modifier"
+    return None
+
+def _fbx_mesh_geometry(geom, mesh):
+    """評価済みメッシュをGeometryノードに書き込む
+
+    戻り値: (頂点数, loop_start, loop_total, Layer 0 に載せるLayerElement一覧)
+    """
+    n_verts, n_loops, n_polys = len(mesh.vertices), len(mesh.loops), len(mesh.polygons)
+    co = np.empty(n_verts * 3, np.float32)
+    mesh.vertices.foreach_get("co", co)
+    pvi = np.empty(n_loops, np.int32)
+    mesh.loops.foreach_get("vertex_index", pvi)
+    loop_start = np.empty(n_polys, np.int32)
+    loop_total = np.empty(n_polys, np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    pvi[loop_start + loop_total - 1] ^= -1  # 各ポリゴンの最終インデックスはビット反転
+
+    normals = np.empty(n_loops * 3, np.float32)
+    if hasattr(mesh, "corner_normals"):
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+    smooth = np.empty(n_polys, bool)
+    mesh.polygons.foreach_get("use_smooth", smooth)
+
+    geom.add("Properties70")
+    geom.add("GeometryVersion", 124)
+    geom.add("Vertices", co.astype(np.float64))
+    geom.add("PolygonVertexIndex", pvi)
+
+    layer_elems = []
+    le = geom.add("LayerElementNormal", 0)
+    le.add("Version", 101)
+    le.add("Name", "")
+    le.add("MappingInformationType", "ByPolygonVertex")
+    le.add("ReferenceInformationType", "Direct")
+    le.add("Normals", normals.astype(np.float64))
+    layer_elems.append(("LayerElementNormal", 0))
+
+    le = geom.add("LayerElementSmoothing", 0)
+    le.add("Version", 102)
+    le.add("Name", "")
+    le.add("MappingInformationType", "ByPolygon")
+    le.add("ReferenceInformationType", "Direct")
+    le.add("Smoothing", smooth.astype(np.int32))
+    layer_elems.append(("LayerElementSmoothing", 0))
+
+    uv_index = np.arange(n_loops, dtype=np.int32)
+    for i, uv_layer in enumerate(mesh.uv_layers):
+        uv = np.empty(n_loops * 2, np.float32)
+        uv_layer.data.foreach_get("uv", uv)
+        le = geom.add("LayerElementUV", i)
+        le.add("Version", 101)
+        le.add("Name", uv_layer.name)
+        le.add("MappingInformationType", "ByPolygonVertex")
+        le.add("ReferenceInformationType", "IndexToDirect")
+        le.add("UV", uv.astype(np.float64))
+        le.add("UVIndex", uv_index)
+        if i > 0:
+            layer = geom.add("Layer", i)
+            layer.add("Version", 100)
+            elem = layer.add("LayerElement")
+            elem.add("Type", "LayerElementUV")
+            elem.add("TypedIndex", i)
+        else:
+            layer_elems.append(("LayerElementUV", 0))
+    return n_verts, loop_start, loop_total, layer_elems
+
+def _fbx_material_indices(mesh, slot_map):
+    material_index = np.empty(len(mesh.polygons), np.int32)
+    mesh.polygons.foreach_get("material_index", material_index)
+    lookup = np.asarray(slot_map or [0], np.int32)
+    return lookup[np.clip(material_index, 0, len(lookup) - 1)]
+
+def _fbx_material_color(mat):
+    if mat.use_nodes and mat.node_tree:
+        for node in mat.node_tree.nodes:
+            if node.type == 'BSDF_PRINCIPLED':
+                return tuple(node.inputs["Base Color"].default_value), node.inputs["Alpha"].default_value
+    return tuple(mat.diffuse_color), mat.diffuse_color[3]
+
+def _fbx_transform(matrix):
+    loc, rot, scale = matrix.decompose()
+    rot = rot.to_euler('XYZ')
+    return (tuple(float(v) for v in loc),
+            tuple(math.degrees(v) for v in rot),
+            tuple(float(v) for v in scale))
+
+def write_static_fbx(fpath, depsgraph, scene, unit_objs, move_to_origin):
+    """静的メッシュ/Emptyのみのユニットをバイナリ FBX に書き出す  戻り値: (頂点数, 三角形数)"""
+    uid = iter(range(1000000, 1 << 62))
+    unit = set(unit_objs)
+    objects = _FBXElem("Objects")
+    connections = _FBXElem("Connections")
+    counts = {"Model": 0, "Geometry": 0, "Material": 0}
+    model_uids = {}
+    geometry_uids = {}
+    material_uids = {}
+    total_verts = 0
+    total_tris = 0
+
+    for obj in unit_objs:
+        if obj.parent in unit:
+            matrix = obj.parent.matrix_world.inverted_safe() @ obj.matrix_world
+        else:
+            matrix = obj.matrix_world.copy()
+            if move_to_origin:
+                matrix.translation = Vector((0.0, 0.0, 0.0))
+            matrix = _FBX_GLOBAL_MATRIX @ matrix
+        loc, rot, scale = _fbx_transform(matrix)
+
+        model_uid = _Int64(next(uid))
+        model_uids[obj] = model_uid
+        model = objects.add("Model", model_uid, obj.name + "\x00\x01Model",
+                            "Mesh" if obj.type == 'MESH' else "Null")
+        model.add("Version", 232)
+        model.add_props70([
+            ("Lcl Translation", "Lcl Translation", "", "A", *loc),
+            ("Lcl Rotation", "Lcl Rotation", "", "A", *rot),
+            ("Lcl Scaling", "Lcl Scaling", "", "A", *scale),
+            ("DefaultAttributeIndex", "int", "Integer", "", 0),
+            ("InheritType", "enum", "", "", 1),
+        ])
+        model.add("MultiLayer", 0)
+        model.add("MultiTake", 0)
+        model.add("Shading", True)
+        model.add("Culling", "CullingOff")
+        counts["Model"] += 1
+        if obj.type != 'MESH':
+            continue
+
+        # マテリアル: スロット順に接続し、空スロットは詰める
+        slot_map = []
+        connected = []
+        for slot in obj.material_slots:
+            mat = slot.material
+            if mat is None:
+                slot_map.append(0)
+                continue
+            if mat not in material_uids:
+                mat_uid = _Int64(next(uid))
+                material_uids[mat] = mat_uid
+                color, alpha = _fbx_material_color(mat)
+                elem = objects.add("Material", mat_uid, mat.name + "\x00\x01Material", "")
+                elem.add("Version", 102)
+                elem.add("ShadingModel", "Phong")
+                elem.add("MultiLayer", 0)
+                elem.add_props70([
+                    ("DiffuseColor", "Color", "", "A", *(float(c) for c in color[:3])),
+                    ("DiffuseFactor", "Number", "", "A", 1.0),
+                    ("Opacity", "Number", "", "A", float(alpha)),
+                ])
+                counts["Material"] += 1
+            if mat not in connected:
+                connected.append(mat)
+            slot_map.append(connected.index(mat))
+
+        # 共有メッシュ (モディファイア無し) はGeometryを使い回す。LayerElementMaterialの番号は
+        # オブジェクトごとのスロットの並び (link='OBJECT' で変わる) に依存するのでキーに含める
+        key = (obj.data, tuple(slot_map)) if not obj.modifiers else obj
+        geom_uid = geometry_uids.get(key)
+        if geom_uid is None:
+            obj_eval = obj.evaluated_get(depsgraph)
+            mesh = obj_eval.to_mesh()
+            try:
+                geom_uid = _Int64(next(uid))
+                geom = objects.add("Geometry", geom_uid, obj.data.name + "\x00\x01Geometry", "Mesh")
+                n_verts, loop_start, loop_total, layer_elems = _fbx_mesh_geometry(geom, mesh)
+                if connected:
+                    le = geom.add("LayerElementMaterial", 0)
+                    le.add("Version", 101)
+                    le.add("Name", "")
+                    le.add("MappingInformationType", "ByPolygon")
+                    le.add("ReferenceInformationType", "IndexToDirect")
+                    le.add("Materials", _fbx_material_indices(mesh, slot_map))
+                    layer_elems.append(("LayerElementMaterial", 0))
+                layer = geom.add("Layer", 0)
+                layer.add("Version", 100)
+                for elem_type, typed_index in layer_elems:
+                    elem = layer.add("LayerElement")
+                    elem.add("Type", elem_type)
+                    elem.add("TypedIndex", typed_index)
+            finally:
+                obj_eval.to_mesh_clear()
+            geometry_uids[key] = geom_uid
+            counts["Geometry"] += 1
+            total_verts += n_verts
+            total_tris += int(loop_total.sum()) - 2 * len(loop_total)
+
+        connections.add("C", "OO", geom_uid, model_uid)
+        for mat in connected:
+            connections.add("C", "OO", material_uids[mat], model_uid)
+
+    for obj, model_uid in model_uids.items():
+        parent_uid = model_uids.get(obj.parent, _Int64(0))
+        connections.add("C", "OO", model_uid, parent_uid)
+
+    units = scene.unit_settings
+    unit_scale = 100.0 if units.system == 'NONE' else 100.0 * units.scale_length
+    fps = scene.render.fps / scene.render.fps_base
+    now = time.localtime()
+
+    root = _FBXElem("")
+    header = root.add("FBXHeaderExtension")
+    header.add("FBXHeaderVersion", 1003)
+    header.add("FBXVersion", _FBX_VERSION)
+    header.add("EncryptionType", 0)
+    stamp = header.add("CreationTimeStamp")
+    stamp.add("Version", 1000)
+    for name, value in (("Year", now.tm_year), ("Month", now.tm_mon), ("Day", now.tm_mday),
+                        ("Hour", now.tm_hour), ("Minute", now.tm_min), ("Second", now.tm_sec),
+                        ("Millisecond", 0)):
+        stamp.add(name, value)
+    header.add("Creator", f"Blender ({bpy.app.version_string}) - ForUnity native writer")
+    root.add("FileId", _FBX_FILE_ID)
+    root.add("CreationTime", _FBX_TIME_ID)
+    root.add("Creator", f"Blender ({bpy.app.version_string}) - ForUnity native writer")
+
+    settings = root.add("GlobalSettings")
+    settings.add("Version", 1000)
+    settings.add_props70([
+        ("UpAxis", "int", "Integer", "", 1),
+        ("UpAxisSign", "int", "Integer", "", 1),
+        ("FrontAxis", "int", "Integer", "", 2),
+        ("FrontAxisSign", "int", "Integer", "", 1),
+        ("CoordAxis", "int", "Integer", "", 0),
+        ("CoordAxisSign", "int", "Integer", "", 1),
+        ("OriginalUpAxis", "int", "Integer", "", -1),
+        ("OriginalUpAxisSign", "int", "Integer", "", 1),
+        ("UnitScaleFactor", "double", "Number", "", unit_scale),
+        ("OriginalUnitScaleFactor", "double", "Number", "", unit_scale),
+        ("AmbientColor", "ColorRGB", "Color", "", 0.0, 0.0, 0.0),
+        ("DefaultCamera", "KString", "", "", "Producer Perspective"),
+        ("TimeMode", "enum", "", "", 14),
+        ("TimeSpanStart", "KTime", "Time", "", _Int64(0)),
+        ("TimeSpanStop", "KTime", "Time", "", _Int64(46186158000)),
+        ("CustomFrameRate", "double", "Number", "", float(fps)),
+    ])
+
+    documents = root.add("Documents")
+    documents.add("Count", 1)
+    doc = documents.add("Document", _Int64(next(uid)), "Scene", "Scene")
+    doc.add("Properties70")
+    doc.add("RootNode", _Int64(0))
+    root.add("References")
+
+    definitions = root.add("Definitions")
+    definitions.add("Version", 100)
+    definitions.add("Count", 1 + sum(counts.values()))
+    definitions.add("ObjectType", "GlobalSettings").add("Count", 1)
+    for type_name, count in counts.items():
+        if count:
+            definitions.add("ObjectType", type_name).add("Count", count)
+
+    root.elems.append(objects)
+    root.elems.append(connections)
+    takes = root.add("Takes")
+    takes.add("Current", "")
+
+    _fbx_write_file(fpath, root)
+    return total_verts, total_tris
+
+def unit_cost(obj, members=()):
+    """並列書き出しのシャード分割に使う概算コスト"""
+    if members:
+        return 1 + sum(unit_cost(member) for member in members)
+    data = getattr(obj, "data", None)
+    return len(data.vertices) if obj.type == 'MESH' and data else 1
+
+# ---------------------------------------------------------
+# 2-1) 並列書き出し (バックグラウンドBlenderワーカー)
+# ---------------------------------------------------------
+_WORKER_EXPR = (
+    "import importlib.util\n"
+    "spec = importlib.util.spec_from_file_location('forunity_export_worker', {module!r})\n"
+    "mod = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(mod)\n"
+    "mod.run_export_worker({job!r})\n"
+)
+
+def split_shards(units, costs, count):
+    """コストの大きい順に最も空いているシャードへ割り当てる (LPT)"""
+    shards = [[] for _ in range(max(1, count))]
+    loads = [0] * len(shards)
+    for unit, cost in sorted(zip(units, costs), key=lambda x: -x[1]):
+        i = loads.index(min(loads))
+        shards[i].append(unit)
+        loads[i] += cost
+    return [shard for shard in shards if shard]
+
+def run_export_worker(job_path):
+    """ワーカープロセス側: ジョブJSONのユニットを順に書き出し、結果JSONを書く"""
+    with open(job_path, encoding="utf-8") as f:
+        job = json.load(f)
+
+    units = []
+    missing = []
+    for unit in job["units"]:
+        obj = bpy.data.objects.get(unit["object"])
+        if obj is None:
+            missing.append(dict(unit, ok=False, error="Object not found in snapshot", seconds=0.0,
+                                timings={}, stats={}))
+        else:
+            units.append((obj, unit["filepath"]))
+    results = export_fbx_units(bpy.context, units, job["fbx_settings"], job["options"])
+    results.extend(missing)
+
+    with open(job["result_path"], "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False)
+
+def iter_export_fbx_parallel(units, fbx_settings, options, workers, on_result=None):
+    """.blendのスナップショットを保存し、N個の blender -b ワーカーで分担して書き出す
+
+    ワーカーの終了を待つ間 (完了数, 総数) をyieldする。close()されると残りのワーカーを停止する。
+    units: [(オブジェクト名, 出力パス, コスト)]
+    on_result: ワーカーが終わるたびに、その結果辞書を1つずつ渡して呼ぶ関数
+    戻り値: 結果辞書のリスト (object, filepath, ok, error, seconds, worker)
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="forunity_export_")
+    procs = []
+    try:
+        snapshot = os.path.join(tmp_dir, "snapshot.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True)
+
+        shards = split_shards([{"object": name, "filepath": path} for name, path, _cost in units],
+                              [cost for _name, _path, cost in units], workers)
+        for i, shard in enumerate(shards):
+            job_path = os.path.join(tmp_dir, f"job_{i}.json")
+            result_path = os.path.join(tmp_dir, f"result_{i}.json")
+            log_path = os.path.join(tmp_dir, f"worker_{i}.log")
+            with open(job_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "units": shard,
+                    "fbx_settings": fbx_settings,
+                    "options": options,
+                    "result_path": result_path,
+                }, f, ensure_ascii=False)
+            cmd = [
+                bpy.app.binary_path, "-b", "--factory-startup", snapshot,
+                "--python-expr", _WORKER_EXPR.format(module=os.path.abspath(__file__), job=job_path),
+            ]
+            log = open(log_path, "w", encoding="utf-8")
+            procs.append((i, shard, result_path, log_path, log,
+                          subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)))
+
+        results = []
+        running = list(procs)
+        yield 0, len(units)
+        while running:
+            for entry in list(running):
+                if entry[-1].poll() is None:
+                    continue
+                running.remove(entry)
+                for result in _collect_worker_results(*entry):
+                    results.append(result)
+                    if on_result:
+                        on_result(result)
+            if running:
+                try:
+                    running[0][-1].wait(timeout=0.05)
+                except subprocess.TimeoutExpired:
+                    pass
+            yield len(results), len(units)
+        return results
+    finally:
+        for *_info, log, proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            log.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def _collect_worker_results(i, shard, result_path, log_path, log, proc):
+    log.close()
+    if os.path.exists(result_path):
+        with open(result_path, encoding="utf-8") as f:
+            worker_results = json.load(f)
+    else:
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            tail = f.read()[-300:].strip()
+        error = f"worker {i} exited with {proc.returncode}: {tail}"
+        worker_results = [dict(unit, ok=False, error=error, seconds=0.0, timings={}, stats={})
+                          for unit in shard]
+    for r in worker_results:
+        r["worker"] = i
+    return worker_results
+
+# ---------------------------------------------------------
+# 2-2) 差分書き出し (フィンガープリントキャッシュ)
+# ---------------------------------------------------------
+EXPORT_MANIFEST_NAME = ".forunity_export_manifest.json"
+
+def _plain(value):
+    if isinstance(value, bpy.types.ID):
+        return value.name_full
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return value
+    try:
+        return tuple(_plain(v) for v in value)
+    except TypeError:
+        return repr(value)
+
+# セッションごとに変わる値・参照数・UIの表示状態など、書き出し結果に関係しないプロパティ
+_VOLATILE_RNA_PROPS = frozenset((
+    "rna_type", "session_uid", "persistent_uid", "users", "tag", "is_evaluated", "original",
+    "is_runtime_data", "is_missing", "use_fake_user", "use_extra_user", "is_library_indirect",
+    "is_embedded_data", "is_editmode", "is_active", "show_expanded", "show_in_editmode",
+    "show_on_cage", "execution_time", "preview",
+))
+
+def hash_rna(h, struct):
+    """RNA構造体の単純なプロパティ (IDポインタは名前) をハッシュに加える (_VOLATILE_RNA_PROPS は除く)"""
+    for prop in struct.bl_rna.properties:
+        pid = prop.identifier
+        if pid in _VOLATILE_RNA_PROPS or pid.startswith("is_override") or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, pid, None)
+        if prop.type == 'POINTER' and not isinstance(value, bpy.types.ID):
+            continue
+        h.update(f"{pid}={_plain(value)!r};".encode())
+
+def _hash_buffer(h, collection, attr, typecode, width):
+    buf = array(typecode, [0]) * (len(collection) * width)
+    collection.foreach_get(attr, buf)
+    h.update(buf)
+
+def _hash_mesh(h, mesh):
+    _hash_buffer(h, mesh.vertices, "co", 'f', 3)
+    _hash_buffer(h, mesh.loops, "vertex_index", 'i', 1)
+    _hash_buffer(h, mesh.polygons, "loop_total", 'i', 1)
+    _hash_buffer(h, mesh.polygons, "material_index", 'i', 1)
+    _hash_buffer(h, mesh.polygons, "use_smooth", 'b', 1)
+    _hash_buffer(h, mesh.edges, "vertices", 'i', 2)
+    if "sharp_edge" in mesh.attributes:
+        _hash_buffer(h, mesh.attributes["sharp_edge"].data, "value", 'b', 1)
+    elif "use_edge_sharp" in bpy.types.MeshEdge.bl_rna.properties:
+        _hash_buffer(h, mesh.edges, "use_edge_sharp", 'b', 1)
+    if mesh.has_custom_normals:
+        if hasattr(mesh, "corner_normals"):
+            _hash_buffer(h, mesh.corner_normals, "vector", 'f', 3)
+        else:
+            mesh.calc_normals_split()
+            _hash_buffer(h, mesh.loops, "normal", 'f', 3)
+    for uv in mesh.uv_layers:
+        h.update(uv.name.encode())
+        _hash_buffer(h, uv.data, "uv", 'f', 2)
+
+def _hash_weights(h, obj, mesh):
+    """頂点グループ名と頂点ごとの (グループ, ウェイト)。評価済みメッシュの形には出ないので別に加える"""
+    if not obj.vertex_groups:
+        return
+    h.update("|".join(g.name for g in obj.vertex_groups).encode())
+    groups = array('i')
+    weights = array('f')
+    for v in mesh.vertices:
+        groups.append(len(v.groups))
+        for g in v.groups:
+            groups.append(g.group)
+            weights.append(g.weight)
+    h.update(groups)
+    h.update(weights)
+
+def _hash_shape_keys(h, mesh):
+    """シェイプキーの設定と座標 (アクティブ以外のキーの編集は評価済みメッシュに出ない)"""
+    key = mesh.shape_keys
+    if key is None:
+        return
+    h.update(f"relative={key.use_relative};".encode())
+    for block in key.key_blocks:
+        h.update(f"{block.name}:{block.relative_key.name}:{block.value}:{block.mute}:"
+                 f"{block.slider_min}:{block.slider_max}:{block.vertex_group};".encode())
+        _hash_buffer(h, block.data, "co", 'f', 3)
+
+def _hash_material(h, mat):
+    hash_rna(h, mat)
+    if mat.node_tree:
+        for node in mat.node_tree.nodes:
+            h.update(f"{node.bl_idname}:{node.name};".encode())
+            for inp in node.inputs:
+                if hasattr(inp, "default_value"):
+                    h.update(repr(_plain(inp.default_value)).encode())
+            image = getattr(node, "image", None)
+            if image:
+                h.update(image.filepath.encode())
+        for link in mat.node_tree.links:
+            h.update(f"{link.from_node.name}.{link.from_socket.identifier}>"
+                     f"{link.to_node.name}.{link.to_socket.identifier}:{getattr(link, 'is_muted', False)};".encode())
+
+def _hash_action(h, action):
+    h.update(action.name_full.encode())
+    for fc in action.fcurves:
+        h.update(f"{fc.data_path}[{fc.array_index}];".encode())
+        _hash_buffer(h, fc.keyframe_points, "co", 'f', 2)
+        _hash_buffer(h, fc.keyframe_points, "interpolation", 'i', 1)
+
+def _unit_actions(objects, fbx_settings):
+    if not fbx_settings["bake_anim"]:
+        return []
+    if fbx_settings["bake_anim_use_all_actions"]:
+        return sorted(bpy.data.actions, key=lambda a: a.name_full)
+    actions = {}
+    for obj in objects:
+        for anim in (obj.animation_data, getattr(getattr(obj.data, "shape_keys", None), "animation_data", None)):
+            if not anim:
+                continue
+            if anim.action:
+                actions[anim.action.name_full] = anim.action
+            if fbx_settings["bake_anim_use_nla_strips"]:
+                for track in anim.nla_tracks:
+                    for strip in track.strips:
+                        if strip.action:
+                            actions[strip.action.name_full] = strip.action
+    return [actions[k] for k in sorted(actions)]
+
+def fingerprint_unit(depsgraph, objects, fbx_settings, extra=None):
+    """書き出し結果に影響する内容 (評価済みメッシュ・モディファイア・マテリアル・
+    アーマチュア/アクション・書き出し設定) からユニットのフィンガープリントを作る
+
+    extra: 書き出しオプションやシーンのフレーム範囲・fpsなど、オブジェクトの外にある条件
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([fbx_settings, extra], sort_keys=True).encode())
+    for obj in sorted(set(objects), key=lambda o: o.name_full):
+        h.update(f"{obj.name_full}:{obj.type}:{getattr(obj.parent, 'name_full', '')}:"
+                 f"{obj.parent_type}:{obj.parent_bone};".encode())
+        h.update(repr(_plain(obj.matrix_world)).encode())
+        for mod in obj.modifiers:
+            hash_rna(h, mod)
+        for slot in obj.material_slots:
+            if slot.material:
+                _hash_material(h, slot.material)
+        if obj.type == 'MESH':
+            obj_eval = obj.evaluated_get(depsgraph)
+            mesh = obj_eval.to_mesh()
+            try:
+                _hash_mesh(h, mesh)
+                _hash_weights(h, obj, mesh)
+            finally:
+                obj_eval.to_mesh_clear()
+            _hash_shape_keys(h, obj.data)
+        elif obj.type == 'ARMATURE':
+            bones = obj.data.bones
+            h.update("|".join(b.name for b in bones).encode())
+            _hash_buffer(h, bones, "head_local", 'f', 3)
+            _hash_buffer(h, bones, "tail_local", 'f', 3)
+            _hash_buffer(h, bones, "matrix_local", 'f', 16)
+        elif obj.data is not None:
+            hash_rna(h, obj.data)
+    for action in _unit_actions(objects, fbx_settings):
+        _hash_action(h, action)
+    return h.hexdigest()
+
+def _file_signature(fpath):
+    st = os.stat(fpath)
+    return st.st_size, st.st_mtime_ns
+
+def load_export_manifest(base_dir):
+    path = os.path.join(base_dir, EXPORT_MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"version": 1, "units": {}}
+    manifest.setdefault("units", {})
+    return manifest
+
+def save_export_manifest(base_dir, manifest):
+    path = os.path.join(base_dir, EXPORT_MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def is_unit_unchanged(manifest, fpath, fingerprint):
+    entry = manifest["units"].get(os.path.basename(fpath))
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return False
+    try:
+        size, mtime_ns = _file_signature(fpath)
+    except OSError:
+        return False
+    return entry.get("size") == size and entry.get("mtime_ns") == mtime_ns
+
+def record_unit(manifest, fpath, fingerprint):
+    size, mtime_ns = _file_signature(fpath)
+    manifest["units"][os.path.basename(fpath)] = {
+        "fingerprint": fingerprint, "size": size, "mtime_ns": mtime_ns,
+    }
+
+# ---------------------------------------------------------
+# 2-4) 書き出しテレメトリ
+# ---------------------------------------------------------
+# ユニットごとのフェーズ別時間 (select: 選択切替 / origin: 原点移動と復元 / export: FBX出力。
+# 標準エクスポーターではアニメーションのベイクもexportに含まれる) と規模をJSON/CSVに残す。
+EXPORT_REPORT_NAME = "forunity_export_report"
+SLOWEST_UNITS = 5
+_REPORT_TIMINGS = ("select", "origin", "export")
+_REPORT_STATS = ("objects", "vertices", "triangles", "bones", "actions", "bytes")
+_export_summary = {}
+
+def unit_stats(depsgraph, unit_objs, fbx_settings, fpath):
+    """テレメトリ用: ユニットの頂点/三角形/ボーン/アクション数と出力ファイルサイズ"""
+    verts = tris = bones = 0
+    for obj in unit_objs:
+        if obj.type == 'MESH':
+            mesh = obj.evaluated_get(depsgraph).data
+            verts += len(mesh.vertices)
+            tris += len(mesh.loops) - 2 * len(mesh.polygons)
+        elif obj.type == 'ARMATURE':
+            bones += len(obj.data.bones)
+    return {
+        "objects": len(unit_objs),
+        "vertices": verts,
+        "triangles": tris,
+        "bones": bones,
+        "actions": len(_unit_actions(unit_objs, fbx_settings)),
+        "bytes": os.path.getsize(fpath) if os.path.exists(fpath) else 0,
+    }
+
+def _report_row(result):
+    row = {
+        "object": result["object"],
+        "filepath": result["filepath"],
+        "ok": result["ok"],
+        "error": result["error"],
+        "writer": result["stats"].get("writer", ""),
+        "worker": result.get("worker", ""),
+        "seconds": round(result["seconds"], 4),
+    }
+    row.update({key: round(result["timings"].get(key, 0.0), 4) for key in _REPORT_TIMINGS})
+    row.update({key: result["stats"].get(key, 0) for key in _REPORT_STATS})
+    return row
+
+def summarize_export(results, elapsed):
+    """パネル表示とレポート用のサマリー (遅いユニット上位とスループット)"""
+    total_bytes = sum(r["stats"].get("bytes", 0) for r in results)
+    slowest = sorted(results, key=lambda r: r["seconds"], reverse=True)[:SLOWEST_UNITS]
+    return {
+        "units": len(results),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "seconds": elapsed,
+        "bytes": total_bytes,
+        "mb_per_sec": total_bytes / 1e6 / elapsed if elapsed > 0 else 0.0,
+        "slowest": [{"object": r["object"], "seconds": r["seconds"]} for r in slowest],
+    }
+
+def write_export_report(base_dir, results, summary):
+    """書き出し先に forunity_export_report.json / .csv を書く"""
+    rows = [_report_row(r) for r in results]
+    with open(os.path.join(base_dir, EXPORT_REPORT_NAME + ".json"), "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "units": rows}, f, ensure_ascii=False, indent=1)
+    with open(os.path.join(base_dir, EXPORT_REPORT_NAME + ".csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["object"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+def last_export_summary():
+    return _export_summary or None
+
+# ---------------------------------------------------------
+# 2-5) 書き出し後処理 (ハッシュ・Unityへのコピー・アーカイブ)
+# ---------------------------------------------------------
+# ファイル操作だけをスレッドプールで行う (bpyには触れない)。
+# メインスレッドは submit() したらすぐ次のユニットの書き出しに進む。
+def file_digest(fpath):
+    h = hashlib.blake2b(digest_size=16)
+    with open(fpath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def publish_file(fpath, dest_dir):
+    """fpathをハッシュし、dest_dirへ原子的にコピーする (同じ内容のファイルがあればスキップ)
+
+    一時ファイルはUnityが無視するドット始まりの名前で書き、os.replaceで差し替える。
+    """
+    t = time.perf_counter()
+    size = os.path.getsize(fpath)
+    result = {"filepath": fpath, "digest": file_digest(fpath), "bytes": size, "copied": False}
+    if dest_dir:
+        dest = os.path.join(dest_dir, os.path.basename(fpath))
+        if not (os.path.exists(dest) and os.path.getsize(dest) == size
+                and file_digest(dest) == result["digest"]):
+            tmp = os.path.join(dest_dir, "." + os.path.basename(fpath) + ".tmp")
+            shutil.copyfile(fpath, tmp)
+            os.replace(tmp, dest)
+            result["copied"] = True
+    result["seconds"] = time.perf_counter() - t
+    return result
+
+def archive_files(paths, zip_path):
+    """paths をzipにまとめる (一時ファイルに書いてから差し替え)"""
+    tmp = zip_path + ".tmp"
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for path in paths:
+            zf.write(path, os.path.basename(path))
+    os.replace(tmp, zip_path)
+    return zip_path
+
+class PostExportPipeline:
+    """書き出し済みファイルをバックグラウンドでハッシュ・コピーする
+
+    submit() はすぐ戻る。finish() で残りを待ち、必要ならアーカイブを作ってサマリーを返す。
+    """
+
+    def __init__(self, dest_dir, workers=2):
+        self.dest_dir = dest_dir
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="forunity_post")
+        self._futures = []
+        self._lock = threading.Lock()
+        self._depth = 0
+        self.max_depth = 0
+        self._start = None
+
+    def submit(self, fpath):
+        if self._start is None:
+            self._start = time.perf_counter()
+        with self._lock:
+            self._depth += 1
+            self.max_depth = max(self.max_depth, self._depth)
+        future = self._pool.submit(publish_file, fpath, self.dest_dir)
+        future.add_done_callback(self._done)
+        self._futures.append(future)
+
+    def _done(self, _future):
+        with self._lock:
+            self._depth -= 1
+
+    def shutdown(self):
+        """キャンセル時: 未着手のコピーを取り消し、実行中のものだけ待つ"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def finish(self, archive_path=None):
+        files, errors = [], []
+        for future in self._futures:
+            try:
+                files.append(future.result())
+            except Exception as e:
+                errors.append(str(e))
+        if archive_path and files:
+            try:
+                self._pool.submit(archive_files, [f["filepath"] for f in files], archive_path).result()
+            except Exception as e:
+                errors.append(str(e))
+                archive_path = None
+        self._pool.shutdown()
+        seconds = time.perf_counter() - self._start if self._start is not None else 0.0
+        total_bytes = sum(f["bytes"] for f in files)
+        return {
+            "files": len(files),
+            "copied": sum(1 for f in files if f["copied"]),
+            "identical": sum(1 for f in files if self.dest_dir and not f["copied"]),
+            "bytes": total_bytes,
+            "seconds": seconds,
+            "mb_per_sec": total_bytes / 1e6 / seconds if seconds > 0 else 0.0,
+            "max_depth": self.max_depth,
+            "archive": archive_path,
+            "errors": errors,
+        }
+
 class FORUNITY_OT_export_selected_fbx(bpy.types.Operator):
     """選択オブジェクトを個別FBXで書き出し"""
     bl_idname = "forunity.export_selected_fbx"
@@ -165,117 +1397,584 @@ class FORUNITY_OT_export_selected_fbx(bpy.types.Operator):
             self.report({'WARNING'}, "オブジェクトが選択されていません。")
             return {'CANCELLED'}
 
-        prefs = get_prefs()
-        scene = context.scene
-        base_dir = ensure_dir(prefs.export_base_dir if prefs.export_base_dir else "//")
-        original_active = context.view_layer.objects.active
-
-        export_anim = scene.forunity_export_animation
-        key_bones = scene.forunity_key_all_bones
-        use_nla = scene.forunity_nla_strips
-        use_all_actions = scene.forunity_all_actions
-        force_keying = scene.forunity_force_start_end_keying
-        sample_rate = scene.forunity_sampling_rate
-        simplify_val = scene.forunity_simplify
-        move_to_origin = getattr(scene, "forunity_export_move_to_origin", False)
-
         if bpy.ops.object.mode_set.poll():
             try:
                 bpy.ops.object.mode_set(mode='OBJECT')
             except:
                 pass
 
-        exported = 0
-        for obj in sel:
-            for o in context.view_layer.objects:
-                o.select_set(False)
-
-            if self.include_children:
-                def _select_children(o):
-                    o.select_set(True)
-                    for c in o.children:
-                        _select_children(c)
-                _select_children(obj)
-            else:
-                obj.select_set(True)
-
-            if self.include_parent_armature and obj.parent and obj.parent.type == 'ARMATURE':
-                obj.parent.select_set(True)
-                context.view_layer.objects.active = obj.parent
-            else:
-                context.view_layer.objects.active = obj
-
-            fname = sanitize_filename(obj.name) + ".fbx"
-            fpath = os.path.join(base_dir, fname)
-
-            moved_objects = {}
-            if move_to_origin:
-                targets_to_move = [obj]
-                if self.include_parent_armature and obj.parent and obj.parent.type == 'ARMATURE':
-                    targets_to_move.append(obj.parent)
-
-                for target in targets_to_move:
-                    if target not in moved_objects:
-                        moved_objects[target] = target.matrix_world.copy()
-                        new_matrix = target.matrix_world.copy()
-                        new_matrix.translation = Vector((0.0, 0.0, 0.0))
-                        target.matrix_world = new_matrix
-
-            try:
-                bpy.ops.export_scene.fbx(
-                    filepath=fpath,
-                    use_selection=True,
-                    add_leaf_bones=False,
-                    armature_nodetype='NULL',
-                    apply_unit_scale=True,
-                    bake_space_transform=False,
-                    object_types={'EMPTY', 'MESH', 'ARMATURE', 'LIGHT'},
-                    use_mesh_modifiers=True,
-                    mesh_smooth_type='FACE',
-                    use_tspace=False,
-                    use_custom_props=False,
-                    path_mode='AUTO',
-                    embed_textures=False,
-                    apply_scale_options='FBX_SCALE_UNITS',
-                    bake_anim=export_anim,
-                    bake_anim_use_all_bones=key_bones if export_anim else True,
-                    bake_anim_use_nla_strips=use_nla if export_anim else True,
-                    bake_anim_use_all_actions=use_all_actions if export_anim else True,
-                    bake_anim_force_startend_keying=force_keying if export_anim else True,
-                    bake_anim_step=sample_rate if export_anim else 1.0,
-                    bake_anim_simplify_factor=simplify_val if export_anim else 1.0,
-                )
-                exported += 1
-            except Exception as e:
-                self.report({'ERROR'}, f"{obj.name} の書き出しに失敗: {e}")
-            finally:
-                if move_to_origin and moved_objects:
-                    for target, matrix in moved_objects.items():
-                        target.matrix_world = matrix
-
-        for o in context.view_layer.objects:
-            o.select_set(False)
-        for o in sel:
-            o.select_set(True)
-        context.view_layer.objects.active = original_active
-
-        self.report({'INFO'}, f"FBXを書き出しました: {exported}個")
-        return {'FINISHED'}
+        include_children = self.include_children
+        include_parent_armature = self.include_parent_armature
+        if use_job_queue(context):
+            names = [obj.name for obj in sel]
+            enqueue_job(f"FBX書き出し ({len(sel)}個)", lambda report: iter_export_batch(
+                bpy.context, [bpy.data.objects[n] for n in names if n in bpy.data.objects],
+                include_children, include_parent_armature, report))
+            self.report({'INFO'}, "FBX書き出しをキューに追加しました")
+            return {'FINISHED'}
+        return run_steps(iter_export_batch(context, sel, include_children, include_parent_armature,
+                                           self.report))
+
+def iter_export_batch(context, sel, include_children, include_parent_armature, report, prefs=None):
+    """Export Selected as FBX の本体。ユニットごとに (完了数, 総数) をyieldする
+
+    report: Operator.report と同じ形の関数
+    prefs: export_base_dir / export_workers / unity_assets_dir を持つ設定 (省略時はアドオン設定)
+    """
+    prefs = prefs or get_prefs()
+    scene = context.scene
+    base_dir = ensure_dir(prefs.export_base_dir if prefs.export_base_dir else "//")
+    fbx_settings = gather_fbx_settings(scene)
+    options = {
+        "include_children": include_children,
+        "include_parent_armature": include_parent_armature,
+        "move_to_origin": getattr(scene, "forunity_export_move_to_origin", False),
+        "native_writer": getattr(scene, "forunity_export_native", False),
+        "native_benchmark": getattr(scene, "forunity_export_native_benchmark", False),
+    }
+    parallel = getattr(scene, "forunity_export_parallel", False)
+    incremental = getattr(scene, "forunity_export_incremental", False)
+
+    # アーマチュア単位: リグを共有するメッシュを1つのFBXにまとめ、アクションのベイクを1回にする
+    groups = {}
+    if fbx_settings["bake_anim"] and getattr(scene, "forunity_export_group_armature", False):
+        sel, groups = group_units_by_armature(sel)
+    options["groups"] = groups
+
+    units = [(obj, os.path.join(base_dir, sanitize_filename(obj.name) + ".fbx")) for obj in sel]
+
+    # 差分書き出し: フィンガープリントと出力ファイルが変わっていないユニットを除外
+    fingerprints = {}
+    skipped = 0
+    hash_time = 0.0
+    if incremental:
+        t = time.perf_counter()
+        manifest = load_export_manifest(base_dir)
+        depsgraph = context.evaluated_depsgraph_get()
+        children_index = build_children_index(context.view_layer.objects)
+        pending = []
+        for obj, fpath in units:
+            unit_objs = collect_unit_objects(obj, include_children, include_parent_armature,
+                                             children_index, unit_members(obj, options))
+            extra = dict(options, groups=groups.get(obj.name, []), frame_start=scene.frame_start,
+                         frame_end=scene.frame_end, fps=scene_fps(scene))
+            extra.pop("native_benchmark")  # 計測の有無は書き出すFBXを変えない
+            fingerprint = fingerprint_unit(depsgraph, unit_objs, fbx_settings, extra=extra)
+            if is_unit_unchanged(manifest, fpath, fingerprint):
+                skipped += 1
+                continue
+            fingerprints[fpath] = fingerprint
+            pending.append((obj, fpath))
+        units = pending
+        hash_time = time.perf_counter() - t
+
+    # 書き出し後処理: 書けたファイルから順にバックグラウンドでハッシュ・コピーする
+    pipeline = None
+    post_copy = getattr(scene, "forunity_post_copy", False)
+    post_archive = getattr(scene, "forunity_post_archive", False)
+    if post_copy and not prefs.unity_assets_dir:
+        report({'WARNING'}, "Unityコピー先がアドオン設定で指定されていないため、コピーをスキップします")
+        post_copy = False
+    if (post_copy or post_archive) and units:
+        pipeline = PostExportPipeline(ensure_dir(prefs.unity_assets_dir) if post_copy else "")
+
+    def on_result(result):
+        if result["ok"]:
+            pipeline.submit(result["filepath"])
+
+    t = time.perf_counter()
+    try:
+        if parallel and len(units) > 1:
+            workers = min(prefs.export_workers, len(units))
+            results = yield from iter_export_fbx_parallel(
+                [(obj.name, fpath, unit_cost(obj, unit_members(obj, options))) for obj, fpath in units],
+                fbx_settings, options, workers, on_result=on_result if pipeline else None)
+        else:
+            workers = 1
+            results = yield from iter_export_fbx_units(context, units, fbx_settings, options,
+                                                       on_result=on_result if pipeline else None)
+    except BaseException:
+        if pipeline:
+            pipeline.shutdown()
+        raise
+    elapsed = time.perf_counter() - t
+
+    post = None
+    if pipeline:
+        archive_path = None
+        if post_archive:
+            archive_path = os.path.join(base_dir, time.strftime("forunity_export_%Y%m%d_%H%M%S.zip"))
+        post = pipeline.finish(archive_path)
+        for error in post["errors"]:
+            report({'ERROR'}, f"書き出し後処理に失敗: {error}")
+
+    exported = 0
+    for r in results:
+        if r["ok"]:
+            exported += 1
+            if incremental:
+                record_unit(manifest, r["filepath"], fingerprints[r["filepath"]])
+        else:
+            report({'ERROR'}, f"{r['object']} の書き出しに失敗: {r['error']}")
+    if incremental:
+        save_export_manifest(base_dir, manifest)
+
+    summary = summarize_export(results, elapsed)
+    _export_summary.clear()
+    _export_summary.update(summary)
+    if getattr(scene, "forunity_export_report", False) and results:
+        write_export_report(base_dir, results, summary)
+
+    msg = f"FBXを書き出しました: {exported}個"
+    if groups:
+        grouped = sum(len(names) for names in groups.values())
+        msg += f" / アーマチュア単位: {len(groups)}リグ ({grouped}メッシュ)"
+    if incremental:
+        msg += f" / スキップ: {skipped}個 (ハッシュ {hash_time:.2f}s)"
+    native = [r for r in results if r["ok"] and r["stats"].get("writer") == "native"]
+    if native:
+        mtris = sum(r["stats"]["triangles"] for r in native) / 1e6
+        native_time = sum(r["timings"]["export"] for r in native)
+        msg += f" / 高速ライター: {len(native)}個 {mtris:.2f}M tris"
+        if mtris > 0:
+            msg += f" ({native_time / mtris:.2f}s/Mtri)"
+        measured = [r for r in native if "stock_seconds" in r["stats"]]
+        if measured:
+            m_mtris = sum(r["stats"]["triangles"] for r in measured) / 1e6
+            m_native = sum(r["timings"]["export"] for r in measured)
+            m_stock = sum(r["stats"]["stock_seconds"] for r in measured)
+            if m_mtris > 0:
+                msg += f" / 計測: 標準 {m_stock / m_mtris:.2f}s/Mtri"
+            if m_native > 0:
+                msg += f" ({m_stock / m_native:.1f}倍)"
+    if post:
+        msg += (f" / 後処理: {post['files']}個 (コピー {post['copied']}, 同一 {post['identical']}, "
+                f"{post['mb_per_sec']:.1f} MB/s, キュー最大 {post['max_depth']})")
+        if post["archive"]:
+            msg += f" / {os.path.basename(post['archive'])}"
+    select_time = sum(r["timings"].get("select", 0.0) for r in results)
+    report({'INFO'}, f"{msg} (ワーカー {workers} / 書き出し {elapsed:.2f}s, 選択切替 {select_time:.2f}s, "
+                     f"{summary['mb_per_sec']:.1f} MB/s)")
+    return {'FINISHED'}
 
 # =========================================================
 # 3) Tris to Quads
 # =========================================================
+def scope_mesh_objects(context, scope):
+    """SELECTION / COLLECTION (アクティブコレクション以下) / SCENE のメッシュオブジェクト"""
+    if scope == 'SELECTION':
+        objs = context.selected_objects
+    elif scope == 'COLLECTION':
+        objs = context.collection.all_objects
+    else:
+        objs = context.scene.objects
+    return [o for o in objs if o.type == 'MESH']
+
+def count_triangles(mesh):
+    """loop_totalを一括取得して三角形の数を数える (Pythonでポリゴンを回さない)"""
+    n = len(mesh.polygons)
+    if n == 0:
+        return 0
+    sizes = np.empty(n, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", sizes)
+    return int(np.count_nonzero(sizes == 3))
+
+def join_triangles_bmesh(mesh, face_threshold, shape_threshold, can_rebuild=False):
+    """bmesh.ops.join_triangles でメッシュデータを直接四角化する。戻り値: 減った面の数
+
+    can_rebuild: NumPy版と引数を揃えるためのもので、ここでは使わない
+    """
+    bm = bmesh.new()
+    try:
+        bm.from_mesh(mesh)
+        before = len(bm.faces)
+        bmesh.ops.join_triangles(bm, faces=bm.faces[:],
+                                 angle_face_threshold=face_threshold,
+                                 angle_shape_threshold=shape_threshold,
+                                 cmp_seam=False, cmp_sharp=False, cmp_uvs=False,
+                                 cmp_vcols=False, cmp_materials=False)
+        joined = before - len(bm.faces)
+        if joined:
+            bm.to_mesh(mesh)
+            mesh.update()
+        return joined
+    finally:
+        bm.free()
+
+# ---------------------------------------------------------
+# 3-1) NumPy版 (三角形の組をまとめて計算する)
+# ---------------------------------------------------------
+def _unit_rows(v):
+    length = np.sqrt(np.einsum("ij,ij->i", v, v))
+    return v / np.where(length > 0.0, length, 1.0)[:, None]
+
+def _row_angle(a, b):
+    return np.arccos(np.clip(np.einsum("ij,ij->i", a, b), -1.0, 1.0))
+
+def _tri_normal(a, b, c):
+    return _unit_rows(np.cross(a - b, b - c))
+
+def _tri_area(a, b, c):
+    n = np.cross(b - a, c - a)
+    return 0.5 * np.sqrt(np.einsum("ij,ij->i", n, n))
+
+def quad_join_error(v0, v1, v2, v3):
+    """bmeshのjoin_trianglesと同じ評価値 (法線差 + 角の直角からのずれ + 凹み)。小さいほど良い"""
+    n1, n2 = _tri_normal(v0, v1, v2), _tri_normal(v0, v2, v3)
+    angle_a = _row_angle(n1, n2)
+    n1, n2 = _tri_normal(v1, v2, v3), _tri_normal(v3, v0, v1)
+    angle_b = _row_angle(n1, n2)
+    error = (angle_a + angle_b) / (math.pi * 2)
+
+    e = [_unit_rows(v0 - v1), _unit_rows(v1 - v2), _unit_rows(v2 - v3), _unit_rows(v3 - v0)]
+    error += sum(np.abs(_row_angle(e[i], e[(i + 1) % 4]) - math.pi / 2) for i in range(4)) / (math.pi * 2)
+
+    area_a = _tri_area(v0, v1, v2) + _tri_area(v0, v2, v3)
+    area_b = _tri_area(v1, v2, v3) + _tri_area(v3, v0, v1)
+    area_max = np.maximum(area_a, area_b)
+    error += np.where(area_max > 0.0, 1.0 - np.minimum(area_a, area_b) / np.where(area_max > 0.0, area_max, 1.0), 1.0)
+    return error
+
+def _quad_shape_ok(v0, v1, v2, v3, shape_threshold):
+    """四隅の角度が直角から shape_threshold 以内で、裏返っていない"""
+    d = [v0 - v1, v1 - v2, v2 - v3, v3 - v0]
+    flipped = np.einsum("ij,ij->i", np.cross(d[0], d[1]), np.cross(d[2], d[3])) < 0.0
+    e = [_unit_rows(x) for x in d]
+    ok = ~flipped
+    for i in range(4):
+        ok &= np.abs(_row_angle(e[i], e[(i + 1) % 4]) - math.pi / 2) <= shape_threshold
+    return ok
+
+def greedy_face_matching(face_a, face_b, error, face_count):
+    """誤差の小さい順に、両方の面が未使用なら採用する貪欲マッチング
+
+    局所的に最小な辺 (両隣の面の候補の中で最小) をまとめて採用する反復で求める。
+    一度に採れる辺が少なくなったら残りは順番に処理する (結果は単純な貪欲法と同じ)。
+    戻り値: 採用した候補のインデックス (昇順)
+    """
+    rank = np.empty(len(error), dtype=np.int64)
+    rank[np.argsort(error, kind="stable")] = np.arange(len(error))
+    alive = np.arange(len(error))
+    claimed = np.zeros(face_count, dtype=bool)
+    chosen = []
+    sentinel = len(error)
+    while len(alive):
+        fa, fb, r = face_a[alive], face_b[alive], rank[alive]
+        best = np.full(face_count, sentinel, dtype=np.int64)
+        np.minimum.at(best, fa, r)
+        np.minimum.at(best, fb, r)
+        dominant = (best[fa] == r) & (best[fb] == r)
+        picked = alive[dominant]
+        chosen.append(picked)
+        claimed[face_a[picked]] = True
+        claimed[face_b[picked]] = True
+        alive = alive[~(claimed[fa] | claimed[fb])]
+        if len(picked) * 10 < len(alive):
+            rest = []
+            for i in alive[np.argsort(rank[alive])].tolist():
+                a, b = face_a[i], face_b[i]
+                if not (claimed[a] or claimed[b]):
+                    claimed[a] = claimed[b] = True
+                    rest.append(i)
+            chosen.append(np.array(rest, dtype=np.int64))
+            break
+    return np.sort(np.concatenate(chosen)) if chosen else np.empty(0, dtype=np.int64)
+
+def pair_triangles(co, loop_start, loop_total, loop_vert, loop_edge, edge_count,
+                   face_threshold, shape_threshold):
+    """Alt+J と同じ基準で結合する三角形の組を求める (NumPy)
+
+    戻り値: (結合する辺, 面Aの共有辺ループ, 面Bの共有辺ループ) (共有辺に乗っている各面のループ)
+    """
+    empty = np.empty(0, dtype=np.int64)
+    face_of_loop = np.repeat(np.arange(len(loop_start)), loop_total)
+    tri_loops = np.flatnonzero(loop_total[face_of_loop] == 3)
+    faces_per_edge = np.bincount(loop_edge, minlength=edge_count)
+    tri_loops = tri_loops[faces_per_edge[loop_edge[tri_loops]] == 2]
+    order = tri_loops[np.argsort(loop_edge[tri_loops], kind="stable")]
+    edges_sorted = loop_edge[order]
+    # 同じ辺のループが2つ並んでいる (= 両側とも三角形) 組だけを残す
+    pair = np.flatnonzero(edges_sorted[:-1] == edges_sorted[1:])
+    if not len(pair):
+        return empty, empty, empty
+    la, lb = order[pair], order[pair + 1]
+    fa, fb = face_of_loop[la], face_of_loop[lb]
+    keep = fa != fb
+    la, lb, fa, fb = la[keep], lb[keep], fa[keep], fb[keep]
+    swap = fa > fb
+    la, lb = np.where(swap, lb, la), np.where(swap, la, lb)
+    fa, fb = np.where(swap, fb, fa), np.where(swap, fa, fb)
+
+    def next_loop(l, f):
+        return loop_start[f] + (l - loop_start[f] + 1) % 3
+
+    def prev_loop(l, f):
+        return loop_start[f] + (l - loop_start[f] + 2) % 3
+
+    v0 = co[loop_vert[la]]
+    v1 = co[loop_vert[prev_loop(la, fa)]]
+    v2 = co[loop_vert[next_loop(la, fa)]]
+    v3 = co[loop_vert[prev_loop(lb, fb)]]
+
+    ok = np.ones(len(la), dtype=bool)
+    if face_threshold < math.pi:
+        na, nb = _tri_normal(v0, v2, v1), _tri_normal(v2, v0, v3)
+        ok &= np.einsum("ij,ij->i", na, nb) >= math.cos(face_threshold)
+    if shape_threshold < math.pi:
+        ok &= _quad_shape_ok(v0, v1, v2, v3, shape_threshold)
+    la, lb, fa, fb = la[ok], lb[ok], fa[ok], fb[ok]
+    v0, v1, v2, v3 = v0[ok], v1[ok], v2[ok], v3[ok]
+    if not len(la):
+        return empty, empty, empty
+
+    picked = greedy_face_matching(fa, fb, quad_join_error(v0, v1, v2, v3), len(loop_start))
+    la, lb = la[picked], lb[picked]
+    return loop_edge[la], la, lb
+
+# Blender 4.0以降はメッシュの全データが汎用属性なので、属性ごとに並べ替えて一括で書き戻せる。
+# data_type: (foreach_getのキー, 成分数, dtype)
+_ATTR_LAYOUT = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'INT8': ("value", 1, np.int32),
+    'BOOLEAN': ("value", 1, bool),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT2': ("vector", 2, np.float32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+    'INT32_2D': ("value", 2, np.int32),
+    'QUATERNION': ("value", 4, np.float32),
+}
+_TOPOLOGY_ATTRS = {"position", ".edge_verts", ".corner_vert", ".corner_edge"}
+
+def _foreach_array(collection, attr, count, width=1, dtype=np.int32):
+    buf = np.empty(count * width, dtype=dtype)
+    collection.foreach_get(attr, buf)
+    return buf
+
+def mesh_can_rebuild(mesh):
+    """clear_geometryして配列から組み直しても失うものが無いメッシュか"""
+    if bpy.app.version < (4, 0, 0) or mesh.shape_keys or mesh.has_custom_normals:
+        return False
+    return all(a.data_type in _ATTR_LAYOUT for a in mesh.attributes if a.name not in _TOPOLOGY_ATTRS)
+
+def joined_topology(loop_start, loop_total, edge_count, pair_edges, la, lb):
+    """三角形の組を結合した後の並びを求める (面Aの位置に四角形を置き、面Bと共有辺を消す)
+
+    戻り値: (新しい面の元の面, 新しいloop_start, 新しいループの元のループ, 残す辺のマスク)
+    """
+    fa = np.searchsorted(loop_start, la, side="right") - 1
+    fb = np.searchsorted(loop_start, lb, side="right") - 1
+
+    def step(l, f, k):
+        return loop_start[f] + (l - loop_start[f] + k) % 3
+
+    new_total = loop_total.copy()
+    new_total[fa] = 4
+    new_total[fb] = 0
+    face_src = np.flatnonzero(new_total)
+    new_total = new_total[face_src]
+    new_start = np.zeros(len(face_src), dtype=np.int64)
+    np.cumsum(new_total[:-1], out=new_start[1:])
+
+    is_quad = np.zeros(len(loop_start), dtype=bool)
+    is_quad[fa] = True
+    plain = ~is_quad[face_src]
+    lens = new_total[plain]
+    within = np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)
+    loop_src = np.empty(int(new_total.sum()), dtype=np.int64)
+    loop_src[np.repeat(new_start[plain], lens) + within] = np.repeat(loop_start[face_src[plain]], lens) + within
+    # 四角形: 面Bの共有辺の次・前、面Aの共有辺の次・前 (面Aの向きを保つ)
+    quad_pos = np.searchsorted(face_src, fa)
+    quad_loops = np.stack([step(lb, fb, 1), step(lb, fb, 2), step(la, fa, 1), step(la, fa, 2)], axis=1)
+    loop_src[new_start[quad_pos][:, None] + np.arange(4)] = quad_loops
+
+    edge_keep = np.ones(edge_count, dtype=bool)
+    edge_keep[pair_edges] = False
+    return face_src, new_start, loop_src, edge_keep
+
+def _rebuild_joined_mesh(mesh, co, loop_start, loop_total, loop_vert, loop_edge, pair_edges, la, lb):
+    """結合後のポリゴン・ループ・辺の配列をclear_geometryしたメッシュへ一括で書き戻す
+
+    ループ・面・辺の属性は元の要素から引き継ぐ。
+    """
+    face_src, new_start, loop_src, edge_keep = joined_topology(loop_start, loop_total, len(mesh.edges),
+                                                               pair_edges, la, lb)
+    edge_map = np.cumsum(edge_keep) - 1
+    edge_verts = _foreach_array(mesh.edges, "vertices", len(edge_keep), 2).reshape(-1, 2)[edge_keep]
+    remap = {'POINT': None, 'EDGE': edge_keep, 'FACE': face_src, 'CORNER': loop_src}
+
+    saved = []
+    for attr in mesh.attributes:
+        if attr.name in _TOPOLOGY_ATTRS or attr.domain not in remap:
+            continue
+        key, width, dtype = _ATTR_LAYOUT[attr.data_type]
+        values = _foreach_array(attr.data, key, len(attr.data), width, dtype).reshape(-1, width)
+        index = remap[attr.domain]
+        saved.append((attr.name, attr.data_type, attr.domain, key, values if index is None else values[index]))
+    uv_active = mesh.uv_layers.active.name if mesh.uv_layers.active else None
+    uv_render = [uv.name for uv in mesh.uv_layers if uv.active_render]
+
+    mesh.clear_geometry()
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set("co", co.astype(np.float32).ravel())
+    mesh.edges.add(len(edge_verts))
+    mesh.edges.foreach_set("vertices", edge_verts.ravel())
+    mesh.loops.add(len(loop_src))
+    mesh.loops.foreach_set("vertex_index", loop_vert[loop_src].astype(np.int32))
+    mesh.loops.foreach_set("edge_index", edge_map[loop_edge[loop_src]].astype(np.int32))
+    mesh.polygons.add(len(face_src))
+    mesh.polygons.foreach_set("loop_start", new_start.astype(np.int32))
+    for name, data_type, domain, key, values in saved:
+        attr = mesh.attributes.get(name)
+        try:
+            if attr is None or attr.data_type != data_type or attr.domain != domain:
+                attr = mesh.attributes.new(name, data_type, domain)
+            attr.data.foreach_set(key, values.ravel())
+        except RuntimeError:
+            pass  # 作り直せない内部属性 (選択状態など)
+    if uv_active in mesh.uv_layers:
+        mesh.uv_layers.active = mesh.uv_layers[uv_active]
+    for name in uv_render:
+        if name in mesh.uv_layers:
+            mesh.uv_layers[name].active_render = True
+    mesh.update()
+
+def _dissolve_edges_bmesh(mesh, pair_edges):
+    bm = bmesh.new()
+    try:
+        bm.from_mesh(mesh)
+        bm.edges.ensure_lookup_table()
+        bmesh.ops.dissolve_edges(bm, edges=[bm.edges[i] for i in pair_edges.tolist()],
+                                 use_verts=False, use_face_split=False)
+        bm.to_mesh(mesh)
+    finally:
+        bm.free()
+    mesh.update()
+
+def join_triangles_numpy(mesh, face_threshold, shape_threshold, can_rebuild=False):
+    """NumPyで三角形の組を決め、配列の一括書き戻し (不可ならbmeshのdissolve_edges) で結合する
+
+    can_rebuild: 頂点グループを持つオブジェクトが使っていない (clear_geometryで失うものが無い)
+    戻り値: 減った面の数
+    """
+    face_count, loop_count = len(mesh.polygons), len(mesh.loops)
+    loop_start = _foreach_array(mesh.polygons, "loop_start", face_count).astype(np.int64)
+    loop_total = _foreach_array(mesh.polygons, "loop_total", face_count).astype(np.int64)
+    expected = np.zeros(face_count, dtype=np.int64)
+    np.cumsum(loop_total[:-1], out=expected[1:])
+    if not np.array_equal(loop_start, expected):
+        return join_triangles_bmesh(mesh, face_threshold, shape_threshold)
+    co = _foreach_array(mesh.vertices, "co", len(mesh.vertices), 3, np.float32).reshape(-1, 3).astype(np.float64)
+    loop_vert = _foreach_array(mesh.loops, "vertex_index", loop_count).astype(np.int64)
+    loop_edge = _foreach_array(mesh.loops, "edge_index", loop_count).astype(np.int64)
+
+    pair_edges, la, lb = pair_triangles(co, loop_start, loop_total, loop_vert, loop_edge, len(mesh.edges),
+                                        face_threshold, shape_threshold)
+    if not len(pair_edges):
+        return 0
+    if can_rebuild and mesh_can_rebuild(mesh):
+        _rebuild_joined_mesh(mesh, co, loop_start, loop_total, loop_vert, loop_edge, pair_edges, la, lb)
+    else:
+        _dissolve_edges_bmesh(mesh, pair_edges)
+    return len(pair_edges)
+
+TRIS_TO_QUADS_ENGINES = {
+    'BMESH': join_triangles_bmesh,
+    'NUMPY': join_triangles_numpy,
+}
+
+def face_vertex_sets(mesh):
+    """面を頂点の組 (並び順は無視) の集合にする。エンジン同士の結果の照合用"""
+    loop_vert = _foreach_array(mesh.loops, "vertex_index", len(mesh.loops))
+    starts = _foreach_array(mesh.polygons, "loop_start", len(mesh.polygons))
+    totals = _foreach_array(mesh.polygons, "loop_total", len(mesh.polygons))
+    return {tuple(sorted(loop_vert[s:s + n].tolist())) for s, n in zip(starts.tolist(), totals.tolist())}
+
+def tris_to_quads_meshes(meshes, engine, face_threshold, shape_threshold, verify=False):
+    """共有メッシュは一度だけ、三角形が2枚未満のメッシュは読み込まずにスキップして四角化する
+
+    verify: 結果をbmesh版 (join_triangles) と照合し、食い違った面の数を数える
+    戻り値: (処理したメッシュ数, スキップ数, 減った面の数, スキップ理由 [(名前, 理由)], 食い違った面の数)
+    """
+    join = TRIS_TO_QUADS_ENGINES[engine]
+    # clear_geometryで頂点ウェイトを失わないよう、頂点グループを持つオブジェクトのメッシュは組み直さない
+    grouped = {o.data for o in bpy.data.objects if o.type == 'MESH' and o.vertex_groups}
+    processed = skipped = joined = mismatched = 0
+    reasons = []
+    for mesh in dict.fromkeys(meshes):
+        if mesh.library:
+            skipped += 1
+            reasons.append((mesh.name, "Linked"))
+            continue
+        if count_triangles(mesh) < 2:
+            skipped += 1
+            continue
+        reference = None
+        if verify and engine != 'BMESH':
+            reference = mesh.copy()
+            join_triangles_bmesh(reference, face_threshold, shape_threshold)
+        joined += join(mesh, face_threshold, shape_threshold, mesh not in grouped)
+        processed += 1
+        if reference is not None:
+            mismatched += len(face_vertex_sets(mesh) ^ face_vertex_sets(reference))
+            bpy.data.meshes.remove(reference)
+    return processed, skipped, joined, reasons, mismatched
+
 class FORUNITY_OT_tris_to_quads_all(bpy.types.Operator):
     """全メッシュオブジェクトにAlt+J適用"""
     bl_idname = "forunity.tris_to_quads_all"
     bl_label = "Clean Faces (Alt+J) All"
     bl_options = {"REGISTER", "UNDO"}
 
+    engine: bpy.props.EnumProperty(
+        name="方式",
+        items=[
+            ('BMESH', "bmesh (高速)", "メッシュデータに直接join_trianglesを実行し、表示・選択・モードを変えない"),
+            ('NUMPY', "NumPy (大規模)", "三角形の組をNumPyでまとめて計算し、ポリゴン配列を一括で書き戻す"),
+            ('OPERATOR', "編集モード", "従来どおりオブジェクトごとに編集モードでtris_convert_to_quadsを実行"),
+        ],
+        default='BMESH'
+    )
+    scope: bpy.props.EnumProperty(
+        name="対象",
+        items=[
+            ('SELECTION', "選択", "選択中のメッシュ"),
+            ('COLLECTION', "コレクション", "アクティブコレクション以下のメッシュ"),
+            ('SCENE', "シーン", "シーン内の全メッシュ"),
+        ],
+        default='SCENE'
+    )
+    face_threshold: bpy.props.FloatProperty(name="Max Face Angle", subtype='ANGLE',
+                                            default=math.radians(40.0), min=0.0, max=math.pi)
+    shape_threshold: bpy.props.FloatProperty(name="Max Shape Angle", subtype='ANGLE',
+                                             default=math.radians(40.0), min=0.0, max=math.pi)
+    verify: bpy.props.BoolProperty(name="bmeshと照合", description="NumPy版の結果をbmesh版と比べ、食い違った面の数を報告します", default=False)
+
     def execute(self, context):
+        if self.engine == 'OPERATOR':
+            return self._execute_operator(context)
+
+        mesh_objs = scope_mesh_objects(context, self.scope)
+        t = time.perf_counter()
+        with ensure_object_mode():
+            processed, skipped, joined, reasons, mismatched = tris_to_quads_meshes(
+                [obj.data for obj in mesh_objs], self.engine, self.face_threshold, self.shape_threshold,
+                verify=self.verify)
+        for name, reason in reasons:
+            self.report({'WARNING'}, f"{name}: 処理をスキップ ({reason})")
+        msg = (f"処理完了: メッシュ {processed}個 / スキップ {skipped}個 "
+               f"(面 -{joined}, {time.perf_counter() - t:.2f}s)")
+        if self.verify and self.engine != 'BMESH':
+            msg += f" / bmesh照合: 不一致 {mismatched}面"
+        self.report({'INFO'}, msg)
+        return {'FINISHED'}
+
+    def _execute_operator(self, context):
         prev_mode = context.mode
         prev_active = context.view_layer.objects.active
+        mesh_objs = scope_mesh_objects(context, self.scope)
         bpy.ops.object.select_all(action='DESELECT')
-        mesh_objs = [obj for obj in context.scene.objects if obj.type == 'MESH']
 
         for obj in mesh_objs:
             try:
@@ -321,6 +2020,273 @@ class FORUNITY_OT_tris_to_quads_all(bpy.types.Operator):
 # =========================================================
 # 4) Modifier to Shape Keys
 # =========================================================
+class BakeSink:
+    """iter_bake_sweep の出力先。1オブジェクトにつき1つ
+
+    add() に渡る頂点バッファは次のフレームで上書きされるので、残すならコピーする。
+    """
+    with_normals = False
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.timings = {}
+
+    def begin(self, frames):
+        pass
+
+    def add(self, index, frame, co, normals):
+        raise NotImplementedError
+
+    def finish(self):
+        """全フレームを受け取った後に呼ぶ。戻り値は出力先ごとの結果"""
+        return None
+
+    def abort(self):
+        """途中で止めたときの後始末"""
+        pass
+
+    def _time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+def iter_bake_sweep(context, sinks, frames):
+    """フレーム範囲を1回だけ進め、各フレームで全出力先のオブジェクトの評価済み頂点を渡す
+
+    シーンの評価 (frame_set) はフレームにつき1回で、オブジェクト数に比例するのは転送だけ。
+    頂点バッファはオブジェクトごとに1本を使い回す。1フレームごとに (完了数, 総数) をyieldする。
+    戻り値: (sink.finish() の結果のリスト, フェーズ別の秒数 {評価, 転送})
+    """
+    frames = list(frames)
+    scene = context.scene
+    depsgraph = context.evaluated_depsgraph_get()
+    buffers = []
+    for sink in sinks:
+        count = len(sink.obj.data.vertices)
+        buffers.append((np.empty(count * 3, dtype=np.float32),
+                        np.empty(count * 3, dtype=np.float32) if sink.with_normals else None))
+        sink.begin(frames)
+    timings = {"評価": 0.0, "転送": 0.0}
+    for i, frame in enumerate(frames):
+        t = time.perf_counter()
+        scene.frame_set(frame)
+        context.view_layer.update()
+        timings["評価"] += time.perf_counter() - t
+        for sink, (co, normals) in zip(sinks, buffers):
+            t = time.perf_counter()
+            mesh_eval = sink.obj.evaluated_get(depsgraph).data
+            if len(mesh_eval.vertices) * 3 != len(co):
+                raise ValueError(f"{sink.obj.name}: 頂点数が一致しません(フレーム {frame})")
+            mesh_eval.vertices.foreach_get("co", co)
+            if normals is not None:
+                mesh_eval.vertices.foreach_get("normal", normals)
+            timings["転送"] += time.perf_counter() - t
+            sink.add(i, frame, co, normals)
+        yield i + 1, len(frames)
+    return [sink.finish() for sink in sinks], timings
+
+def iter_bake_job(context, sinks, frames):
+    """iter_bake_sweep を包み、終了・中断のどちらでも現在フレームを戻す
+
+    途中でclose() (ジョブキューのEsc) されるか例外になったら、全出力先を abort() して
+    作りかけのシェイプキー・キャッシュを残さない。
+    戻り値: (sink.finish() の結果のリスト, フェーズ別の秒数 {評価, 転送, キー作成, ...}, 経過秒数)
+    """
+    scene = context.scene
+    original_frame = scene.frame_current
+    t = time.perf_counter()
+    finished = False
+    try:
+        results, timings = yield from iter_bake_sweep(context, sinks, frames)
+        finished = True
+    finally:
+        if not finished:
+            for sink in sinks:
+                try:
+                    sink.abort()
+                except ReferenceError:
+                    pass  # アンドゥで作り直されたID。データはアンドゥで戻っている
+        scene.frame_set(original_frame)
+    for sink in sinks:
+        for name, seconds in sink.timings.items():
+            timings[name] = timings.get(name, 0.0) + seconds
+    return results, timings, time.perf_counter() - t
+
+def iter_bake_shapekeys(context, name, frames, tolerance, deform_group, report):
+    """Bake Modifier to Shape Keys の本体。フレームごとに (完了数, 総数) をyieldする
+
+    オブジェクトは最初の next() で名前から解決する (キューに積んでいる間のアンドゥに備える)。
+    """
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        report({'ERROR'}, f"オブジェクトが見つかりません: {name}")
+        return {'CANCELLED'}
+    try:
+        (stats,), timings, elapsed = yield from iter_bake_job(context, [ShapeKeySink(obj, tolerance)], frames)
+    except ValueError as e:
+        report({'ERROR'}, str(e))
+        return {'CANCELLED'}
+    if deform_group:
+        assign_deform_group(obj, stats["moved"])
+    fps = stats["frames"] / elapsed if elapsed > 0 else 0.0
+    report({'INFO'}, f"{stats['kept']}個のシェイプキーを作成しました "
+                     f"({format_bake_size(stats)} / {elapsed:.2f}s {fps:.1f} fps / {format_timings(timings)})")
+    return {'FINISHED'}
+
+def assign_deform_group(obj, moved):
+    """moved (頂点ごとのbool) の頂点を頂点グループ Baked_Deform にまとめる"""
+    group = obj.vertex_groups.get("Baked_Deform") or obj.vertex_groups.new(name="Baked_Deform")
+    group.remove(list(range(len(obj.data.vertices))))
+    group.add(np.flatnonzero(moved).tolist(), 1.0, 'REPLACE')
+
+class ShapeKeySink(BakeSink):
+    """フレームごとの頂点位置を Frame_XXXX シェイプキーにする
+
+    直前に残したフレームとの最大頂点移動量が tolerance 以下のフレームはキーを作らない。
+    begin() で消したBasis以外の既存キーは控えておき、abort() で元に戻す。
+    finish() でキーフレームを打ち、統計を返す:
+    frames / kept / vertices / moved (Basisから動いた頂点のマスク) / sparse_vertices
+    """
+
+    def __init__(self, obj, tolerance=0.0):
+        super().__init__(obj)
+        self.tolerance = tolerance
+        self.kept = []
+
+    def begin(self, frames):
+        obj = self.obj
+        self.created_basis = not obj.data.shape_keys
+        if self.created_basis:
+            obj.shape_key_add(name="Basis", from_mix=False)
+        count = len(obj.data.vertices)
+        self.removed = []
+        for sk in [sk for sk in obj.data.shape_keys.key_blocks if sk.name != "Basis"]:
+            co = np.empty(count * 3, dtype=np.float32)
+            sk.data.foreach_get("co", co)
+            self.removed.append((sk.name, sk.relative_key.name, co, {p: getattr(sk, p) for p in _SHAPE_KEY_PROPS}))
+            obj.shape_key_remove(sk)
+        basis = np.empty(count * 3, dtype=np.float32)
+        obj.data.shape_keys.reference_key.data.foreach_get("co", basis)
+        self.basis = basis.reshape(-1, 3)
+        self.last_kept = None
+        self.stats = {"frames": 0, "kept": 0, "vertices": count, "moved": np.zeros(count, dtype=bool),
+                      "sparse_vertices": 0}
+
+    def add(self, index, frame, co, normals):
+        self.stats["frames"] += 1
+        points = co.reshape(-1, 3)
+        if self.last_kept is not None and np.abs(points - self.last_kept).max(initial=0.0) <= self.tolerance:
+            return
+        self.last_kept = points.copy()
+        deformed = np.abs(points - self.basis).max(axis=1) > self.tolerance
+        self.stats["moved"] |= deformed
+        self.stats["sparse_vertices"] += int(np.count_nonzero(deformed))
+        t = time.perf_counter()
+        name = f"Frame_{frame:04d}"
+        shape_key = self.obj.shape_key_add(name=name, from_mix=False)
+        t2 = time.perf_counter()
+        shape_key.data.foreach_set("co", co)
+        self._time("キー作成", t2 - t)
+        self._time("転送", time.perf_counter() - t2)
+        self.kept.append((name, frame))
+
+    def finish(self):
+        t = time.perf_counter()
+        key_shapekey_sequence(self.obj.data.shape_keys, self.kept)
+        self._time("キーフレーム", time.perf_counter() - t)
+        self.stats["kept"] = len(self.kept)
+        return self.stats
+
+    def abort(self):
+        """途中まで作ったシェイプキー (と begin で足したBasis) を消し、begin で消したキーを戻す
+
+        F-Curveは finish() まで作らないので触らない (同名の既存キーのアニメーションを残すため)。
+        """
+        obj = self.obj
+        key = obj.data.shape_keys
+        if key is None:
+            return
+        for name, _ in self.kept:
+            if name in key.key_blocks:
+                obj.shape_key_remove(key.key_blocks[name])
+        self.kept.clear()
+        for name, _, co, props in self.removed:
+            block = obj.shape_key_add(name=name, from_mix=False)
+            block.data.foreach_set("co", co)
+            for prop, value in props.items():
+                setattr(block, prop, value)
+        for name, relative, _, _ in self.removed:
+            if relative in key.key_blocks:
+                key.key_blocks[name].relative_key = key.key_blocks[relative]
+        self.removed = []
+        if self.created_basis and len(key.key_blocks) == 1:
+            obj.shape_key_remove(key.key_blocks[0])
+
+def format_bake_size(stats):
+    """残したキーと全フレーム分のキーのサイズ比較 (Blender: 全頂点float3 / Unity: 動く頂点の位置差分のみ)"""
+    per_key = stats["vertices"] * 12
+    naive = stats["frames"] * per_key / 1e6
+    kept = stats["kept"] * per_key / 1e6
+    sparse = stats["sparse_vertices"] * 16 / 1e6  # 位置差分float3 + 頂点番号
+    return (f"キー {stats['kept']}/{stats['frames']}, 変形頂点 {int(stats['moved'].sum())}/{stats['vertices']}, "
+            f"{naive:.1f}MB → {kept:.1f}MB (Unity差分 {sparse:.1f}MB)")
+
+def action_fcurves(id_data):
+    """id_dataのアクションのF-Curveコレクション (無ければ作る)
+
+    Blender 4.4以降のスロット付きアクションではスロット・レイヤー・ストリップを用意し、
+    そのチャンネルバッグのF-Curveを返す。
+    """
+    anim = id_data.animation_data or id_data.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(f"{id_data.name}Action")
+    action = anim.action
+    if not hasattr(action, "slots"):
+        return action.fcurves
+    if anim.action_slot is None:
+        anim.action_slot = action.slots[0] if len(action.slots) else action.slots.new(id_data.id_type, id_data.name)
+    layer = action.layers[0] if len(action.layers) else action.layers.new("Layer")
+    strip = layer.strips[0] if len(layer.strips) else layer.strips.new(type='KEYFRAME')
+    return strip.channelbag(anim.action_slot, ensure=True).fcurves
+
+_INTERPOLATION_CONSTANT = 0  # bpy.types.Keyframe.interpolation の 'CONSTANT'
+_INTERPOLATION_LINEAR = 1  # 同 'LINEAR'
+
+def fill_fcurve(fcurves, data_path, frames, values, index=0, interpolation=_INTERPOLATION_CONSTANT):
+    """data_pathのF-Curveを作り直し、keyframe_points.add + foreach_set でキーを一括で入れる (既定はCONSTANT)"""
+    fcurve = fcurves.find(data_path, index=index)
+    if fcurve is not None:
+        fcurves.remove(fcurve)
+    fcurve = fcurves.new(data_path, index=index)
+    count = len(frames)
+    co = np.empty(count * 2, dtype=np.float32)
+    co[0::2] = frames
+    co[1::2] = values
+    fcurve.keyframe_points.add(count)
+    fcurve.keyframe_points.foreach_set("co", co)
+    fcurve.keyframe_points.foreach_set("interpolation", np.full(count, interpolation, dtype=np.int32))
+    fcurve.update()
+    return fcurve
+
+def key_shapekey_sequence(key, sequence):
+    """sequence [(シェイプキー名, フレーム)] を順に1つずつ表示するキーを打つ
+
+    各シェイプキーには直前のフレームで0・自分のフレームで1・次のフレームで0の
+    最大3キーだけを入れるので、全体の手間はフレーム数に比例する。
+    戻り値: 作ったキーフレームの数
+    """
+    fcurves = action_fcurves(key)
+    total = 0
+    for i, (name, frame) in enumerate(sequence):
+        frames, values = [frame], [1.0]
+        if i > 0:
+            frames.insert(0, sequence[i - 1][1])
+            values.insert(0, 0.0)
+        if i + 1 < len(sequence):
+            frames.append(sequence[i + 1][1])
+            values.append(0.0)
+        fill_fcurve(fcurves, f'key_blocks["{bpy.utils.escape_identifier(name)}"].value', frames, values)
+        total += len(frames)
+    return total
+
 class FORUNITY_OT_bake_modifier_to_shapekeys(bpy.types.Operator):
     """モディファイアアニメーションをシェイプキーにベイク"""
     bl_idname = "forunity.bake_modifier_to_shapekeys"
@@ -331,6 +2297,8 @@ class FORUNITY_OT_bake_modifier_to_shapekeys(bpy.types.Operator):
     frame_end: bpy.props.IntProperty(name="終了フレーム", default=120, min=0)
     frame_step: bpy.props.IntProperty(name="フレームステップ", default=1, min=1, max=10)
     apply_modifiers: bpy.props.BoolProperty(name="すべてのモディファイアを適用", default=True)
+    tolerance: bpy.props.FloatProperty(name="同一とみなす移動量", description="直前に残したフレームからの最大頂点移動量がこれ以下のフレームはシェイプキーを作りません", default=0.0, min=0.0, subtype='DISTANCE', precision=5)
+    deform_group: bpy.props.BoolProperty(name="変形頂点をグループに", description="ベイク中に動いた頂点を頂点グループ Baked_Deform にまとめます", default=False)
 
     def invoke(self, context, event):
         scene = context.scene
@@ -344,6 +2312,254 @@ class FORUNITY_OT_bake_modifier_to_shapekeys(bpy.types.Operator):
         layout.prop(self, "frame_end")
         layout.prop(self, "frame_step")
         layout.prop(self, "apply_modifiers")
+        layout.prop(self, "tolerance")
+        layout.prop(self, "deform_group")
+
+    def execute(self, context):
+        obj = context.active_object
+        if not obj or obj.type != 'MESH':
+            self.report({'WARNING'}, "メッシュオブジェクトを選択してください")
+            return {'CANCELLED'}
+        if not obj.modifiers:
+            self.report({'WARNING'}, "モディファイアが設定されていません")
+            return {'CANCELLED'}
+
+        frames = range(self.frame_start, self.frame_end + 1, self.frame_step)
+        tolerance, deform_group = self.tolerance, self.deform_group
+        name = obj.name
+        if use_job_queue(context):
+            enqueue_job(f"ベイク ({name})", lambda report: iter_bake_shapekeys(
+                bpy.context, name, frames, tolerance, deform_group, report))
+            self.report({'INFO'}, "ベイクをキューに追加しました (Escで中止・元のシェイプキーに戻します)")
+            return {'FINISHED'}
+        try:
+            return run_steps(iter_bake_shapekeys(context, name, frames, tolerance, deform_group, self.report))
+        except Exception as e:
+            self.report({'ERROR'}, f"ベイクに失敗: {e}")
+            return {'CANCELLED'}
+
+# ---------------------------------------------------------
+# 4-1) Vertex Animation Texture (VAT)
+# ---------------------------------------------------------
+# 1フレーム = テクスチャの rows_per_frame 行 (頂点数が幅を超えたら折り返す)。
+# 行0がテクスチャの下端 (v=0)。頂点 i のテクセルは列 i % width、フレーム f の行 f * rows_per_frame + i // width。
+# UVレイヤー VAT_UV にはフレーム0のテクセル中心を入れ、シェーダーで f * rows_per_frame / height を足す。
+# VAT_UV は常にUVチャンネル VAT_UV_CHANNEL (Unityの uv1 / TEXCOORD1) に置く。足りなければUVを足して埋める。
+# オフセットは元メッシュからの差分なので、ベイクしたモディファイアは既定で無効にする
+# (有効なまま use_mesh_modifiers で書き出すと二重に変形する)。
+VAT_MAX_WIDTH = 8192
+VAT_UV_NAME = "VAT_UV"
+VAT_UV_CHANNEL = 1
+MAX_UV_LAYERS = 8
+
+class VATSink(BakeSink):
+    """フレームごとの元メッシュからのオフセット (と法線) を集め、finish() でVATを書き出す
+
+    finish() の戻り値: サイドカーの内容
+    """
+
+    def __init__(self, obj, directory, file_format='EXR', with_normals=False, fps=24.0, disable_modifiers=True):
+        super().__init__(obj)
+        self.directory = directory
+        self.file_format = file_format
+        self.with_normals = with_normals
+        self.fps = fps
+        self.disable_modifiers = disable_modifiers
+
+    def begin(self, frames):
+        count = len(self.obj.data.vertices)
+        rest = np.empty(count * 3, dtype=np.float32)
+        self.obj.data.vertices.foreach_get("co", rest)
+        self.rest = rest.reshape(-1, 3)
+        self.frames = list(frames)
+        self.offsets = np.empty((len(self.frames), count, 3), dtype=np.float32)
+        self.normals = np.empty((len(self.frames), count, 3), dtype=np.float32) if self.with_normals else None
+
+    def add(self, index, frame, co, normals):
+        np.subtract(co.reshape(-1, 3), self.rest, out=self.offsets[index])
+        if self.normals is not None:
+            self.normals[index] = normals.reshape(-1, 3)
+
+    def finish(self):
+        t = time.perf_counter()
+        disabled = disable_baked_modifiers(self.obj) if self.disable_modifiers else []
+        meta = write_vat(self.obj, self.frames, self.offsets, self.normals, self.directory,
+                         self.file_format, self.fps, disabled)
+        self._time("書き出し", time.perf_counter() - t)
+        return meta
+
+def disable_baked_modifiers(obj):
+    """ビューポート・レンダーで有効なモディファイアを無効にする。戻り値: 無効にしたモディファイア名"""
+    disabled = []
+    for mod in obj.modifiers:
+        if mod.show_viewport or mod.show_render:
+            mod.show_viewport = mod.show_render = False
+            disabled.append(mod.name)
+    return disabled
+
+def vat_layout(vertex_count, frame_count, max_width=VAT_MAX_WIDTH):
+    """戻り値: (幅, 1フレームの行数, 高さ)"""
+    width = max(1, min(vertex_count, max_width))
+    rows_per_frame = -(-vertex_count // width)
+    return width, rows_per_frame, rows_per_frame * frame_count
+
+def vat_pixels(values, width, rows_per_frame):
+    """(フレーム, 頂点, 3) を (高さ, 幅, 4) のRGBA (行0=下端, A=1) に並べる"""
+    frame_count, vertex_count, _ = values.shape
+    pixels = np.ones((frame_count, rows_per_frame * width, 4), dtype=np.float32)
+    pixels[:, :vertex_count, :3] = values
+    pixels[:, vertex_count:, :3] = 0.0
+    return pixels.reshape(frame_count * rows_per_frame, width, 4)
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+def write_png16(fpath, pixels):
+    """RGBA (行0=下端, 0..1) を16bit PNGで書く (Blenderの画像APIは16bit PNGの中身を制御しにくいため自前で符号化)"""
+    height, width, _ = pixels.shape
+    data = np.round(np.clip(pixels[::-1], 0.0, 1.0) * 65535.0).astype(">u2")
+    rows = np.empty((height, 1 + width * 8), dtype=np.uint8)
+    rows[:, 0] = 0  # フィルターなし
+    rows[:, 1:] = data.reshape(height, -1).view(np.uint8)
+    with open(fpath, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 16, 6, 0, 0, 0)))
+        f.write(_png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        f.write(_png_chunk(b"IEND", b""))
+
+def write_exr(fpath, pixels):
+    """RGBA floatをBlenderの画像API経由でOpenEXRに書く (値はそのまま)"""
+    height, width, _ = pixels.shape
+    image = bpy.data.images.new("forunity_vat", width, height, alpha=True, float_buffer=True)
+    try:
+        image.colorspace_settings.name = 'Non-Color'
+        image.pixels.foreach_set(pixels.ravel())
+        image.filepath_raw = fpath
+        image.file_format = 'OPEN_EXR'
+        image.save()
+    finally:
+        bpy.data.images.remove(image)
+
+def assign_vat_uv(mesh, width, height):
+    """頂点ごとのフレーム0テクセル中心を、UVチャンネル VAT_UV_CHANNEL のUVレイヤー VAT_UV に書く
+
+    チャンネルより前のUVが足りなければ空のUVを足し、そのチャンネル以降にUVがあれば
+    一度外して VAT_UV の後ろに付け直す。戻り値: VAT_UV のチャンネル (常に VAT_UV_CHANNEL)
+    """
+    uv_layers = mesh.uv_layers
+    old = uv_layers.get(VAT_UV_NAME)
+    if old is not None:
+        uv_layers.remove(old)
+    while len(uv_layers) < VAT_UV_CHANNEL:
+        uv_layers.new(name=f"UVMap{len(uv_layers)}" if len(uv_layers) else "UVMap")
+    if len(uv_layers) >= MAX_UV_LAYERS:
+        raise ValueError(f"UVレイヤーが{MAX_UV_LAYERS}個あるので {VAT_UV_NAME} を追加できません")
+
+    active = uv_layers.active.name if uv_layers.active else None
+    render = next((layer.name for layer in uv_layers if layer.active_render), None)
+    moved = []
+    for layer in list(uv_layers)[VAT_UV_CHANNEL:]:
+        data = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", data)
+        moved.append((layer.name, data))
+        uv_layers.remove(layer)
+
+    index = np.arange(len(mesh.vertices))
+    vert_uv = np.stack([(index % width + 0.5) / width, (index // width + 0.5) / height], axis=1).astype(np.float32)
+    loop_vert = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    layer = uv_layers.new(name=VAT_UV_NAME, do_init=False)
+    layer.data.foreach_set("uv", vert_uv[loop_vert].ravel())
+    for name, data in moved:
+        uv_layers.new(name=name, do_init=False).data.foreach_set("uv", data)
+
+    if active and active in uv_layers:
+        uv_layers.active = uv_layers[active]
+    if render and render in uv_layers:
+        uv_layers[render].active_render = True
+    return list(uv_layers).index(uv_layers[VAT_UV_NAME])
+
+def scene_fps(scene):
+    return scene.render.fps / scene.render.fps_base
+
+def export_vat(context, obj, frames, directory, file_format='EXR', with_normals=False, disable_modifiers=True):
+    """フレームをサンプリングしてVATを書き出す。戻り値: サイドカーの内容"""
+    sink = VATSink(obj, directory, file_format, with_normals, scene_fps(context.scene), disable_modifiers)
+    (meta,), _timings = run_steps(iter_bake_sweep(context, [sink], frames))
+    return meta
+
+def write_vat(obj, frames, offsets, normals, directory, file_format, fps, disabled_modifiers=()):
+    """VATテクスチャ・サイドカーJSONを書き出し、VAT_UVを追加する。戻り値: サイドカーの内容
+
+    offsets/normals: (フレーム, 頂点, 3)。normalsはNoneなら書き出さない
+    disabled_modifiers: ベイク後に無効にしたモディファイア名 (サイドカーに記録する)
+    """
+    width, rows_per_frame, height = vat_layout(offsets.shape[1], len(frames))
+    base = sanitize_filename(obj.name)
+    ext = ".exr" if file_format == 'EXR' else ".png"
+    bounds_min = offsets.min(axis=(0, 1)) if offsets.size else np.zeros(3, dtype=np.float32)
+    bounds_max = offsets.max(axis=(0, 1)) if offsets.size else np.zeros(3, dtype=np.float32)
+    position = {"texture": base + "_vat_pos" + ext,
+                "bounds_min": bounds_min.tolist(), "bounds_max": bounds_max.tolist()}
+    if file_format == 'EXR':
+        write_exr(os.path.join(directory, position["texture"]), vat_pixels(offsets, width, rows_per_frame))
+        position["encoding"] = "offset = rgb"
+    else:
+        span = np.where(bounds_max > bounds_min, bounds_max - bounds_min, 1.0)
+        write_png16(os.path.join(directory, position["texture"]),
+                    vat_pixels((offsets - bounds_min) / span, width, rows_per_frame))
+        position["encoding"] = "offset = bounds_min + rgb * (bounds_max - bounds_min)"
+    meta = {
+        "object": obj.name,
+        "vertices": int(offsets.shape[1]),
+        "frames": frames,
+        "fps": fps,
+        "width": width,
+        "height": height,
+        "rows_per_frame": rows_per_frame,
+        "origin": "row 0 = bottom (v = 0)",
+        "space": "object (Blender, Z-up), offset from rest position",
+        "position": position,
+        "uv_layer": VAT_UV_NAME,
+        "disabled_modifiers": list(disabled_modifiers),
+    }
+    if normals is not None:
+        meta["normal"] = {"texture": base + "_vat_nrm" + ext, "encoding": "normal = rgb * 2 - 1"}
+        encoded = vat_pixels(normals * 0.5 + 0.5, width, rows_per_frame)
+        if file_format == 'EXR':
+            write_exr(os.path.join(directory, meta["normal"]["texture"]), encoded)
+        else:
+            write_png16(os.path.join(directory, meta["normal"]["texture"]), encoded)
+    meta["uv_channel"] = assign_vat_uv(obj.data, width, height)
+    with open(os.path.join(directory, base + "_vat.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return meta
+
+class FORUNITY_OT_bake_modifier_to_vat(bpy.types.Operator):
+    """モディファイアアニメーションを頂点アニメーションテクスチャ (VAT) にベイク"""
+    bl_idname = "forunity.bake_modifier_to_vat"
+    bl_label = "Bake Modifier to VAT"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    frame_start: bpy.props.IntProperty(name="開始フレーム", default=1, min=0)
+    frame_end: bpy.props.IntProperty(name="終了フレーム", default=120, min=0)
+    frame_step: bpy.props.IntProperty(name="フレームステップ", default=1, min=1, max=10)
+    file_format: bpy.props.EnumProperty(
+        name="形式",
+        items=[
+            ('EXR', "OpenEXR (float)", "オフセットをそのままfloatで保存"),
+            ('PNG16', "PNG (16bit)", "オフセットをバウンディングボックスで0..1に正規化して保存"),
+        ],
+        default='EXR'
+    )
+    normals: bpy.props.BoolProperty(name="法線も書き出す", default=False)
+    disable_modifiers: bpy.props.BoolProperty(name="モディファイアを無効化", description="VATのオフセットは元メッシュからの差分なので、ベイクしたモディファイアをビューポート・レンダーとも無効にします (有効なままFBXに書き出すと二重に変形します)", default=True)
+
+    def invoke(self, context, event):
+        scene = context.scene
+        self.frame_start = scene.frame_start
+        self.frame_end = scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
         obj = context.active_object
@@ -354,64 +2570,441 @@ class FORUNITY_OT_bake_modifier_to_shapekeys(bpy.types.Operator):
             self.report({'WARNING'}, "モディファイアが設定されていません")
             return {'CANCELLED'}
 
+        prefs = get_prefs()
+        directory = ensure_dir(prefs.export_base_dir if prefs.export_base_dir else "//")
         scene = context.scene
         original_frame = scene.frame_current
-        depsgraph = context.evaluated_depsgraph_get()
+        frames = range(self.frame_start, self.frame_end + 1, self.frame_step)
+        t = time.perf_counter()
+        try:
+            meta = export_vat(context, obj, frames, directory, self.file_format, self.normals,
+                              self.disable_modifiers)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        except Exception as e:
+            self.report({'ERROR'}, f"ベイクに失敗: {e}")
+            return {'CANCELLED'}
+        finally:
+            scene.frame_set(original_frame)
 
-        if not obj.data.shape_keys:
-            obj.shape_key_add(name="Basis", from_mix=False)
+        self.report({'INFO'}, f"VATを書き出しました: {meta['position']['texture']} "
+                              f"({meta['width']}x{meta['height']}, {len(meta['frames'])}フレーム, "
+                              f"UV{meta['uv_channel']} = {VAT_UV_NAME}, {time.perf_counter() - t:.2f}s)")
+        return {'FINISHED'}
+
+# ---------------------------------------------------------
+# 4-2) ポイントキャッシュ (PC2) へのストリーミングベイク
+# ---------------------------------------------------------
+# PC2: ヘッダー32バイト (b"POINTCACHE2\0", version=1, 頂点数, 開始フレーム, サンプル間隔, サンプル数)
+# の後に、サンプルごと・頂点ごとの位置 float32 x3 (リトルエンディアン) が続く。
+# 書き込みはメモリマップ経由でフレームごとに行うので、ピークメモリはフレーム数に依存しない (PC2Sink)。
+PC2_HEADER = struct.Struct("<12siiffi")
+PC2_SIGNATURE = b"POINTCACHE2\0"
+
+class PC2Sink(BakeSink):
+    """フレームごとの頂点位置をメモリマップ経由でPC2に書く
+
+    一時ファイルに書いてから置き換えるので、途中で止めても既存のキャッシュは壊れない。
+    finish() の戻り値: 書いたバイト数
+    """
+
+    def __init__(self, obj, fpath, flush_every=32):
+        super().__init__(obj)
+        self.fpath = fpath
+        self.tmp = fpath + ".tmp"
+        self.flush_every = flush_every
+        self.cache = None
+
+    def begin(self, frames):
+        frames = list(frames)
+        count = len(self.obj.data.vertices)
+        step = frames[1] - frames[0] if len(frames) > 1 else 1
+        with open(self.tmp, "wb") as f:
+            f.write(PC2_HEADER.pack(PC2_SIGNATURE, 1, count, float(frames[0]) if frames else 0.0,
+                                    float(step), len(frames)))
+            f.truncate(PC2_HEADER.size + len(frames) * count * 12)
+        if frames and count:
+            self.cache = np.memmap(self.tmp, dtype="<f4", mode="r+", offset=PC2_HEADER.size,
+                                   shape=(len(frames), count * 3))
+
+    def add(self, index, frame, co, normals):
+        t = time.perf_counter()
+        self.cache[index] = co
+        if (index + 1) % self.flush_every == 0:
+            self.cache.flush()
+        self._time("書き込み", time.perf_counter() - t)
+
+    def finish(self):
+        if self.cache is not None:
+            self.cache.flush()
+            self.cache = None  # マップを閉じてから置き換える
+        os.replace(self.tmp, self.fpath)
+        return os.path.getsize(self.fpath)
+
+    def abort(self):
+        self.cache = None
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+def read_pc2(fpath):
+    """PC2をメモリマップで開く。戻り値: (位置 (サンプル, 頂点, 3) の読み取り専用memmap, 開始フレーム, サンプル間隔)"""
+    with open(fpath, "rb") as f:
+        signature, _version, count, start, rate, samples = PC2_HEADER.unpack(f.read(PC2_HEADER.size))
+    if signature != PC2_SIGNATURE:
+        raise ValueError(f"PC2ファイルではありません: {fpath}")
+    cache = np.memmap(fpath, dtype="<f4", mode="r", offset=PC2_HEADER.size, shape=(samples, count, 3))
+    return cache, start, rate
+
+def pc2_sample_range(start, rate, samples, frame_start, frame_end):
+    """フレーム範囲に入るサンプル番号の範囲と、各サンプルのフレーム番号"""
+    frames = start + rate * np.arange(samples)
+    picked = np.flatnonzero((frames >= frame_start - 1e-4) & (frames <= frame_end + 1e-4))
+    if not len(picked):
+        return 0, 0, []
+    return int(picked[0]), int(picked[-1]) + 1, [int(round(f)) for f in frames[picked[0]:picked[-1] + 1]]
+
+def pc2_to_shapekeys(obj, cache, first, last, frames, tolerance=0.0):
+    """キャッシュのサンプル [first, last) から Frame_XXXX シェイプキーを作ってキーを打つ
+
+    1サンプルずつ読むので、メモリはサンプル数に依存しない。戻り値: 残したキー [(名前, フレーム)]
+    """
+    if not obj.data.shape_keys:
+        obj.shape_key_add(name="Basis", from_mix=False)
+    kept = []
+    last_kept = None
+    for i, frame in zip(range(first, last), frames):
+        points = np.asarray(cache[i], dtype=np.float32)
+        if last_kept is not None and np.abs(points - last_kept).max(initial=0.0) <= tolerance:
+            continue
+        last_kept = points
+        name = f"Frame_{frame:04d}"
+        old = obj.data.shape_keys.key_blocks.get(name)
+        if old is not None:
+            obj.shape_key_remove(old)
+        obj.shape_key_add(name=name, from_mix=False).data.foreach_set("co", points.ravel())
+        kept.append((name, frame))
+    key_shapekey_sequence(obj.data.shape_keys, kept)
+    return kept
+
+def pc2_to_vat(obj, cache, first, last, frames, directory, file_format, fps):
+    """キャッシュのサンプル [first, last) からVATを書き出す (読み込むのはこの範囲だけ)
+
+    キャッシュは変形後の位置なので、VATと二重にならないようobjのモディファイアは無効にする。
+    """
+    rest = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    obj.data.vertices.foreach_get("co", rest)
+    offsets = np.asarray(cache[first:last], dtype=np.float32) - rest.reshape(1, -1, 3)
+    return write_vat(obj, frames, offsets, None, directory, file_format, fps, disable_baked_modifiers(obj))
+
+class FORUNITY_OT_bake_modifier_to_pc2(bpy.types.Operator):
+    """モディファイアアニメーションをポイントキャッシュ (PC2) にストリーミングでベイク"""
+    bl_idname = "forunity.bake_modifier_to_pc2"
+    bl_label = "Bake Modifier to PC2"
+    bl_options = {'REGISTER'}
+
+    frame_start: bpy.props.IntProperty(name="開始フレーム", default=1, min=0)
+    frame_end: bpy.props.IntProperty(name="終了フレーム", default=120, min=0)
+    frame_step: bpy.props.IntProperty(name="フレームステップ", default=1, min=1, max=10)
 
-        if obj.data.shape_keys:
-            shape_keys_to_remove = [sk for sk in obj.data.shape_keys.key_blocks if sk.name != "Basis"]
-            for sk in shape_keys_to_remove:
-                obj.shape_key_remove(sk)
+    def invoke(self, context, event):
+        scene = context.scene
+        self.frame_start = scene.frame_start
+        self.frame_end = scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        obj = context.active_object
+        if not obj or obj.type != 'MESH':
+            self.report({'WARNING'}, "メッシュオブジェクトを選択してください")
+            return {'CANCELLED'}
+
+        prefs = get_prefs()
+        fpath = os.path.join(ensure_dir(prefs.export_base_dir if prefs.export_base_dir else "//"),
+                             sanitize_filename(obj.name) + ".pc2")
+        scene = context.scene
+        original_frame = scene.frame_current
+        frames = range(self.frame_start, self.frame_end + 1, self.frame_step)
+        t = time.perf_counter()
+        sink = PC2Sink(obj, fpath)
+        try:
+            (size,), timings = run_steps(iter_bake_sweep(context, [sink], frames))
+        except ValueError as e:
+            sink.abort()
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        except BaseException:
+            sink.abort()
+            raise
+        finally:
+            scene.frame_set(original_frame)
+        elapsed = time.perf_counter() - t
+        timings.update(sink.timings)
+        fps = len(frames) / elapsed if elapsed > 0 else 0.0
+        self.report({'INFO'}, f"PC2を書き出しました: {os.path.basename(fpath)} "
+                              f"({size / 1e6:.1f}MB, {len(frames)}フレーム, {fps:.1f} fps / {format_timings(timings)})")
+        return {'FINISHED'}
+
+class FORUNITY_OT_load_pc2(bpy.types.Operator):
+    """PC2キャッシュの指定フレーム範囲からシェイプキーまたはVATを作る"""
+    bl_idname = "forunity.load_pc2"
+    bl_label = "Load PC2"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(name="PC2ファイル", subtype='FILE_PATH', default="")
+    filter_glob: bpy.props.StringProperty(default="*.pc2", options={'HIDDEN'})
+    target: bpy.props.EnumProperty(
+        name="作成するもの",
+        items=[
+            ('SHAPEKEYS', "シェイプキー", "Frame_XXXX シェイプキーとキーフレームを作る"),
+            ('VAT', "VAT", "書き出し先にVATテクスチャとサイドカーJSONを書き出す"),
+        ],
+        default='SHAPEKEYS'
+    )
+    frame_start: bpy.props.IntProperty(name="開始フレーム", default=0)
+    frame_end: bpy.props.IntProperty(name="終了フレーム", default=100000)
+    file_format: bpy.props.EnumProperty(
+        name="VAT形式",
+        items=[('EXR', "OpenEXR (float)", ""), ('PNG16', "PNG (16bit)", "")],
+        default='EXR'
+    )
 
-        created_keys = 0
-        total_frames = (self.frame_end - self.frame_start) // self.frame_step + 1
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
 
+    def execute(self, context):
+        obj = context.active_object
+        if not obj or obj.type != 'MESH':
+            self.report({'WARNING'}, "メッシュオブジェクトを選択してください")
+            return {'CANCELLED'}
         try:
-            for i, frame in enumerate(range(self.frame_start, self.frame_end + 1, self.frame_step)):
-                scene.frame_set(frame)
-                context.view_layer.update()
-                progress = (i + 1) / total_frames * 100
-                print(f"ベイク中: {progress:.1f}% (Frame {frame})")
-
-                obj_eval = obj.evaluated_get(depsgraph)
-                shape_key_name = f"Frame_{frame:04d}"
-                shape_key = obj.shape_key_add(name=shape_key_name, from_mix=False)
-                mesh_eval = obj_eval.data
-
-                if len(mesh_eval.vertices) != len(shape_key.data):
-                    self.report({'ERROR'}, f"頂点数が一致しません(フレーム {frame})")
-                    return {'CANCELLED'}
-
-                for j, vert in enumerate(mesh_eval.vertices):
-                    shape_key.data[j].co = vert.co
-                created_keys += 1
-
-            self._create_shapekey_animation(obj, self.frame_start, self.frame_end, self.frame_step)
-            self.report({'INFO'}, f"{created_keys}個のシェイプキーを作成しました")
+            cache, start, rate = read_pc2(bpy.path.abspath(self.filepath))
+        except (OSError, ValueError, struct.error) as e:
+            self.report({'ERROR'}, f"PC2を読み込めません: {e}")
+            return {'CANCELLED'}
+        if cache.shape[1] != len(obj.data.vertices):
+            self.report({'ERROR'}, f"頂点数が一致しません (PC2 {cache.shape[1]} / メッシュ {len(obj.data.vertices)})")
+            return {'CANCELLED'}
+        first, last, frames = pc2_sample_range(start, rate, cache.shape[0], self.frame_start, self.frame_end)
+        if not frames:
+            self.report({'WARNING'}, "指定範囲にフレームがありません")
+            return {'CANCELLED'}
+
+        if self.target == 'SHAPEKEYS':
+            kept = pc2_to_shapekeys(obj, cache, first, last, frames)
+            self.report({'INFO'}, f"{len(kept)}個のシェイプキーを作成しました ({frames[0]}-{frames[-1]})")
+        else:
+            prefs = get_prefs()
+            directory = ensure_dir(prefs.export_base_dir if prefs.export_base_dir else "//")
+            meta = pc2_to_vat(obj, cache, first, last, frames, directory, self.file_format,
+                              scene_fps(context.scene))
+            self.report({'INFO'}, f"VATを書き出しました: {meta['position']['texture']} ({len(frames)}フレーム)")
+        return {'FINISHED'}
+
+class FORUNITY_OT_bake_selected_modifiers(bpy.types.Operator):
+    """選択中の全メッシュを1回のフレーム送りでまとめてベイク"""
+    bl_idname = "forunity.bake_selected_modifiers"
+    bl_label = "Bake Selected (1 Sweep)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    frame_start: bpy.props.IntProperty(name="開始フレーム", default=1, min=0)
+    frame_end: bpy.props.IntProperty(name="終了フレーム", default=120, min=0)
+    frame_step: bpy.props.IntProperty(name="フレームステップ", default=1, min=1, max=10)
+    target: bpy.props.EnumProperty(
+        name="出力",
+        items=[
+            ('SHAPEKEYS', "シェイプキー", "オブジェクトごとに Frame_XXXX シェイプキーを作る"),
+            ('VAT', "VAT", "オブジェクトごとにVATテクスチャを書き出す"),
+            ('PC2', "PC2", "オブジェクトごとにPC2キャッシュを書き出す"),
+        ],
+        default='SHAPEKEYS'
+    )
+    tolerance: bpy.props.FloatProperty(name="同一とみなす移動量", default=0.0, min=0.0, subtype='DISTANCE', precision=5)
+    file_format: bpy.props.EnumProperty(
+        name="VAT形式",
+        items=[('EXR', "OpenEXR (float)", ""), ('PNG16', "PNG (16bit)", "")],
+        default='EXR'
+    )
+
+    def invoke(self, context, event):
+        scene = context.scene
+        self.frame_start = scene.frame_start
+        self.frame_end = scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        targets = [o for o in context.selected_objects if o.type == 'MESH' and o.modifiers]
+        if not targets:
+            self.report({'WARNING'}, "モディファイアのあるメッシュオブジェクトを選択してください")
+            return {'CANCELLED'}
+
+        prefs = get_prefs()
+        names = [obj.name for obj in targets]
+        frames = range(self.frame_start, self.frame_end + 1, self.frame_step)
+        settings = {"target": self.target, "tolerance": self.tolerance, "file_format": self.file_format,
+                    "directory": ensure_dir(prefs.export_base_dir if prefs.export_base_dir else "//")}
+        if use_job_queue(context):
+            enqueue_job(f"ベイク ({len(targets)}個)",
+                        lambda report: iter_bake_selected(bpy.context, names, frames, settings, report))
+            self.report({'INFO'}, "ベイクをキューに追加しました (Escで中止・作りかけの出力は削除)")
             return {'FINISHED'}
+        try:
+            return run_steps(iter_bake_selected(context, names, frames, settings, self.report))
         except Exception as e:
             self.report({'ERROR'}, f"ベイクに失敗: {e}")
             return {'CANCELLED'}
-        finally:
-            scene.frame_set(original_frame)
 
-    def _create_shapekey_animation(self, obj, frame_start, frame_end, frame_step):
-        if not obj.data.shape_keys:
-            return
-        shape_keys = obj.data.shape_keys.key_blocks
-        for frame in range(frame_start, frame_end + 1, frame_step):
-            shape_key_name = f"Frame_{frame:04d}"
-            if shape_key_name in shape_keys:
-                shape_key = shape_keys[shape_key_name]
-                for sk in shape_keys:
-                    if sk.name != "Basis":
-                        sk.value = 0.0
-                        sk.keyframe_insert(data_path="value", frame=frame)
-                shape_key.value = 1.0
-                shape_key.keyframe_insert(data_path="value", frame=frame)
+def make_bake_sink(context, obj, settings):
+    """settings (target / tolerance / file_format / directory) に合わせた出力先を作る"""
+    if settings["target"] == 'VAT':
+        return VATSink(obj, settings["directory"], settings["file_format"], fps=scene_fps(context.scene))
+    if settings["target"] == 'PC2':
+        return PC2Sink(obj, os.path.join(settings["directory"], sanitize_filename(obj.name) + ".pc2"))
+    return ShapeKeySink(obj, settings["tolerance"])
+
+def iter_bake_selected(context, names, frames, settings, report):
+    """Bake Selected (1 Sweep) の本体。オブジェクトと出力先は最初の next() で名前から作る"""
+    objects = [bpy.data.objects[name] for name in names if name in bpy.data.objects]
+    if not objects:
+        report({'ERROR'}, "ベイクするオブジェクトが見つかりません")
+        return {'CANCELLED'}
+    sinks = [make_bake_sink(context, obj, settings) for obj in objects]
+    _results, timings, elapsed = yield from iter_bake_job(context, sinks, frames)
+    report({'INFO'}, f"{len(sinks)}個のオブジェクトを{len(frames)}フレーム1回の送りでベイクしました "
+                     f"({elapsed:.2f}s / {format_timings(timings)})")
+    return {'FINISHED'}
+
+# ---------------------------------------------------------
+# 4-3) ベイク済みシェイプキーの基底圧縮 (PCA)
+# ---------------------------------------------------------
+# Frame_XXXX (フレームごとに1つだけ値1) を、オフセット PCA_Offset (常に1) + 基底 PCA_XX (重み0..1) に置き換える。
+# フレームfの形 ≒ Basis + PCA_Offset + Σ 重み_k(f) * PCA_k なので、重みはCONSTANTのF-Curveで各フレームに入れる。
+PCA_PREFIX = "PCA_"
+_FRAME_KEY_RE = re.compile(r"^Frame_(\d+)$")
+
+def pca_compress(deltas, max_error, max_shapes):
+    """フレームごとの頂点差分 (フレーム, 頂点, 3) を、オフセット + K個の基底シェイプ x 重み[0,1] で近似する
+
+    切り詰めSVDの成分数Kは、頂点ごとの誤差 (距離) の最大値が max_error 以下になる最小の値を二分探索で選ぶ
+    (max_shapes で打ち切り)。各成分の係数を [最小, 最大] から [0, 1] に写し、
+    最小値ぶんはオフセットシェイプ (重み常に1) にまとめる。
+    戻り値: (オフセット (頂点, 3), 基底 (K, 頂点, 3), 重み (フレーム, K), 最大誤差, RMS誤差)
+    """
+    frame_count, vertex_count, _ = deltas.shape
+    flat = deltas.reshape(frame_count, -1).astype(np.float32)
+    u, sigma, vt = np.linalg.svd(flat, full_matrices=False)
+    coeffs = u * sigma
+
+    def errors(k):
+        residual = (flat - coeffs[:, :k] @ vt[:k]).reshape(frame_count, vertex_count, 3)
+        dist = np.sqrt(np.einsum("fvi,fvi->fv", residual, residual))
+        return float(dist.max(initial=0.0)), float(np.sqrt(np.mean(dist * dist))) if dist.size else 0.0
+
+    lo, hi = 0, min(max_shapes, len(sigma))
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if errors(mid)[0] <= max_error:
+            hi = mid
+        else:
+            lo = mid + 1
+    max_err, rms_err = errors(lo)
+
+    c = coeffs[:, :lo]
+    c_min, c_max = c.min(axis=0), c.max(axis=0)
+    span = c_max - c_min
+    weights = np.where(span > 0.0, (c - c_min) / np.where(span > 0.0, span, 1.0), 0.0)
+    offset = (c_min @ vt[:lo]).reshape(vertex_count, 3)
+    shapes = (span[:, None] * vt[:lo]).reshape(lo, vertex_count, 3)
+    return offset, shapes, weights.astype(np.float32), max_err, rms_err
+
+def baked_frame_keys(key):
+    """Frame_XXXX シェイプキーを [(フレーム, キー)] でフレーム順に返す"""
+    found = []
+    for sk in key.key_blocks:
+        m = _FRAME_KEY_RE.match(sk.name)
+        if m:
+            found.append((int(m.group(1)), sk))
+    return sorted(found, key=lambda item: item[0])
+
+def remove_shapekeys(obj, names):
+    """シェイプキーと、その値を動かすF-Curveをまとめて削除する"""
+    key = obj.data.shape_keys
+    anim = key.animation_data
+    fcurves = action_fcurves(key) if anim and anim.action else None
+    for name in names:
+        if fcurves is not None:
+            fcurve = fcurves.find(f'key_blocks["{bpy.utils.escape_identifier(name)}"].value')
+            if fcurve is not None:
+                fcurves.remove(fcurve)
+        obj.shape_key_remove(key.key_blocks[name])
+
+def compress_baked_shapekeys(obj, max_error, max_shapes):
+    """objの Frame_XXXX シェイプキーを PCA_Offset + PCA_XX と重みのキーフレームに置き換える
+
+    戻り値: 統計 (frames / shapes / vertices / max_error / rms_error / before_mb / after_mb)
+    """
+    key = obj.data.shape_keys
+    frame_keys = baked_frame_keys(key) if key else []
+    if not frame_keys:
+        raise ValueError("Frame_XXXX シェイプキーがありません")
+    count = len(obj.data.vertices)
+    basis = np.empty(count * 3, dtype=np.float32)
+    key.reference_key.data.foreach_get("co", basis)
+    deltas = np.empty((len(frame_keys), count * 3), dtype=np.float32)
+    for row, (_, sk) in zip(deltas, frame_keys):
+        sk.data.foreach_get("co", row)
+    deltas -= basis
+    offset, shapes, weights, max_err, rms_err = pca_compress(deltas.reshape(len(frame_keys), count, 3),
+                                                             max_error, max_shapes)
+
+    remove_shapekeys(obj, [sk.name for sk in key.key_blocks if sk.name.startswith(PCA_PREFIX)]
+                     + [sk.name for _, sk in frame_keys])
+    frames = [frame for frame, _ in frame_keys]
+    fcurves = action_fcurves(key)
+    names = [f"{PCA_PREFIX}Offset"] + [f"{PCA_PREFIX}{k:02d}" for k in range(len(shapes))]
+    columns = [np.ones(len(frames), dtype=np.float32)] + [weights[:, k] for k in range(len(shapes))]
+    for name, delta, column in zip(names, [offset, *shapes], columns):
+        shape_key = obj.shape_key_add(name=name, from_mix=False)
+        shape_key.data.foreach_set("co", (basis + delta.ravel()).astype(np.float32))
+        fill_fcurve(fcurves, f'key_blocks["{bpy.utils.escape_identifier(name)}"].value', frames, column)
+
+    per_key = count * 12 / 1e6
+    return {"frames": len(frames), "shapes": len(names), "vertices": count,
+            "max_error": max_err, "rms_error": rms_err,
+            "before_mb": len(frames) * per_key, "after_mb": len(names) * per_key}
+
+class FORUNITY_OT_compress_baked_shapekeys(bpy.types.Operator):
+    """ベイクした Frame_XXXX シェイプキーを、少数の基底シェイプ (PCA) と重みアニメーションに圧縮"""
+    bl_idname = "forunity.compress_baked_shapekeys"
+    bl_label = "Compress Baked Shape Keys"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_error: bpy.props.FloatProperty(name="許容誤差", description="各フレーム・各頂点の再構成誤差 (距離) の上限", default=0.001, min=0.0, subtype='DISTANCE', precision=5)
+    max_shapes: bpy.props.IntProperty(name="最大シェイプ数", description="許容誤差に届かなくても基底シェイプはこの数で打ち切ります", default=32, min=1, max=256)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        obj = context.active_object
+        if not obj or obj.type != 'MESH':
+            self.report({'WARNING'}, "メッシュオブジェクトを選択してください")
+            return {'CANCELLED'}
+        try:
+            stats = compress_baked_shapekeys(obj, self.max_error, self.max_shapes)
+        except ValueError as e:
+            self.report({'WARNING'}, str(e))
+            return {'CANCELLED'}
+        except Exception as e:
+            self.report({'ERROR'}, f"圧縮に失敗: {e}")
+            return {'CANCELLED'}
+
+        level = 'WARNING' if stats["max_error"] > self.max_error else 'INFO'
+        self.report({level}, f"シェイプキー {stats['frames']} → {stats['shapes']} "
+                             f"({stats['before_mb']:.1f}MB → {stats['after_mb']:.1f}MB), "
+                             f"最大誤差 {stats['max_error']:.5f} / RMS {stats['rms_error']:.5f}")
+        return {'FINISHED'}
 
 class FORUNITY_OT_clear_baked_shapekeys(bpy.types.Operator):
     """ベイクしたシェイプキーをクリア"""
@@ -430,7 +3023,7 @@ class FORUNITY_OT_clear_baked_shapekeys(bpy.types.Operator):
 
         removed = 0
         shape_keys_to_remove = [sk for sk in obj.data.shape_keys.key_blocks
-                                if sk.name.startswith("Frame_") and sk.name != "Basis"]
+                                if sk.name.startswith(("Frame_", PCA_PREFIX)) and sk.name != "Basis"]
         for sk in shape_keys_to_remove:
             obj.shape_key_remove(sk)
             removed += 1
@@ -490,34 +3083,45 @@ class FORUNITY_OT_render_eevee_png(bpy.types.Operator):
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
 
-        original_engine = scene.render.engine
-        original_filepath = scene.render.filepath
-        original_file_format = scene.render.image_settings.file_format
-        original_color_mode = scene.render.image_settings.color_mode
-        original_film_transparent = scene.render.film_transparent
-
-        try:
-            if bpy.app.version >= (4, 0, 0):
-                scene.render.engine = 'BLENDER_EEVEE_NEXT'
-            else:
-                scene.render.engine = 'BLENDER_EEVEE'
-
-            scene.render.filepath = output_path
-            scene.render.image_settings.file_format = 'PNG'
-            scene.render.image_settings.color_mode = 'RGBA'
-            scene.render.film_transparent = True
-            bpy.ops.render.render(write_still=True)
-            self.report({'INFO'}, f"レンダリング完了: {output_path}")
+        if use_job_queue(context):
+            enqueue_job(f"レンダリング ({default_name})",
+                        lambda report: iter_render_png(bpy.context, output_path, report))
+            self.report({'INFO'}, "レンダリングをキューに追加しました")
             return {'FINISHED'}
-        except Exception as e:
-            self.report({'ERROR'}, f"レンダリング失敗: {e}")
-            return {'CANCELLED'}
-        finally:
-            scene.render.engine = original_engine
-            scene.render.filepath = original_filepath
-            scene.render.image_settings.file_format = original_file_format
-            scene.render.image_settings.color_mode = original_color_mode
-            scene.render.film_transparent = original_film_transparent
+        return run_steps(iter_render_png(context, output_path, self.report))
+
+def iter_render_png(context, output_path, report):
+    """EEVEEでRGBA PNGを1枚レンダリングする (設定を切り替えた後に一度yieldする)"""
+    scene = context.scene
+    original_engine = scene.render.engine
+    original_filepath = scene.render.filepath
+    original_file_format = scene.render.image_settings.file_format
+    original_color_mode = scene.render.image_settings.color_mode
+    original_film_transparent = scene.render.film_transparent
+
+    try:
+        if bpy.app.version >= (4, 0, 0):
+            scene.render.engine = 'BLENDER_EEVEE_NEXT'
+        else:
+            scene.render.engine = 'BLENDER_EEVEE'
+
+        scene.render.filepath = output_path
+        scene.render.image_settings.file_format = 'PNG'
+        scene.render.image_settings.color_mode = 'RGBA'
+        scene.render.film_transparent = True
+        yield 0, 1
+        bpy.ops.render.render(write_still=True)
+        report({'INFO'}, f"レンダリング完了: {output_path}")
+        return {'FINISHED'}
+    except Exception as e:
+        report({'ERROR'}, f"レンダリング失敗: {e}")
+        return {'CANCELLED'}
+    finally:
+        scene.render.engine = original_engine
+        scene.render.filepath = original_filepath
+        scene.render.image_settings.file_format = original_file_format
+        scene.render.image_settings.color_mode = original_color_mode
+        scene.render.film_transparent = original_film_transparent
 
 # =========================================================
 # 6) Simple Deform Angle Key
@@ -608,6 +3212,122 @@ class FU_OT_sd_angle_key_set(bpy.types.Operator):
     def invoke(self, context, event):
         return context.window_manager.invoke_props_dialog(self)
 
+SD_CURVES = {
+    'LINEAR': lambda t: np.clip(t, 0.0, 1.0),
+    'EASE': lambda t: (lambda c: c * c * (3.0 - 2.0 * c))(np.clip(t, 0.0, 1.0)),
+    'WAVE': lambda t: 0.5 - 0.5 * np.cos(2.0 * np.pi * t),
+}
+
+def sd_angle_curve(frames, frame_start, frame_end, angle_from, angle_to, curve, shift=0.0):
+    """フレーム列に対するAngle (ラジアン) の配列
+
+    t = (フレーム - 開始 - shift) / (終了 - 開始) を曲線で0..1に写して angle_from→angle_to を補間する。
+    WAVE は t を1周期とする往復 (範囲外も繰り返す)。shift はオブジェクトごとの遅れ (フレーム)
+    """
+    length = max(frame_end - frame_start, 1)
+    t = (np.asarray(frames, dtype=np.float64) - frame_start - shift) / length
+    return angle_from + (angle_to - angle_from) * SD_CURVES[curve](t)
+
+def key_fcurve_range(fcurves, data_path, frames, values, interpolation):
+    """data_pathのF-Curveの [frames[0], frames[-1]] 内のキーを frames/values で置き換える
+
+    F-Curveは作り直さず、範囲内のキーだけを消して足すので、範囲外のキーの補間・ハンドル・イージングと
+    F-Curveモディファイアはそのまま残る。
+    """
+    fcurve = fcurves.find(data_path)
+    if fcurve is None:
+        return fill_fcurve(fcurves, data_path, frames, values, interpolation=interpolation)
+    points = fcurve.keyframe_points
+    old = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get("co", old)
+    inside = np.flatnonzero((old[0::2] >= frames[0]) & (old[0::2] <= frames[-1]))
+    for i in inside[::-1]:
+        points.remove(points[int(i)], fast=True)
+
+    kept = len(points)
+    points.add(len(frames))
+    co = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get("co", co)
+    co[kept * 2::2] = frames
+    co[kept * 2 + 1::2] = values
+    points.foreach_set("co", co)
+    modes = np.empty(len(points), dtype=np.int32)
+    points.foreach_get("interpolation", modes)
+    modes[kept:] = interpolation
+    points.foreach_set("interpolation", modes)
+    fcurve.update()
+    return fcurve
+
+class FU_OT_sd_angle_key_range(bpy.types.Operator):
+    """選択中の全オブジェクトのSimple Deform (Twist/Bend) のAngleに、フレーム範囲の曲線をまとめてキー挿入"""
+    bl_idname = "forunity.sd_angle_key_range"
+    bl_label = "Range"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    frame_start: bpy.props.IntProperty(name="開始フレーム", default=1, min=0)
+    frame_end: bpy.props.IntProperty(name="終了フレーム", default=120, min=0)
+    frame_step: bpy.props.IntProperty(name="キー間隔", description="何フレームごとにキーを打つか (間はリニア補間)", default=1, min=1, max=100)
+    angle_from: bpy.props.FloatProperty(name="開始 Angle (度)", default=0.0, soft_min=-360.0, soft_max=360.0)
+    angle_to: bpy.props.FloatProperty(name="終了 Angle (度)", default=360.0, soft_min=-360.0, soft_max=360.0)
+    curve: bpy.props.EnumProperty(
+        name="カーブ",
+        items=[
+            ('LINEAR', "リニア", "一定の速さで変化"),
+            ('EASE', "イーズ", "始めと終わりをゆっくり (smoothstep)"),
+            ('WAVE', "往復", "開始→終了→開始を範囲を1周期として繰り返す"),
+        ],
+        default='LINEAR'
+    )
+    object_offset: bpy.props.FloatProperty(name="オブジェクトごとの遅れ", description="名前順に、オブジェクトごとにこのフレーム数ずつ曲線をずらします (往復では位相)", default=0.0, soft_min=-100.0, soft_max=100.0)
+
+    def invoke(self, context, event):
+        scene = context.scene
+        self.frame_start = scene.frame_start
+        self.frame_end = scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        sel = sorted((o for o in context.selected_objects if o.type == 'MESH'), key=lambda o: o.name)
+        if not sel:
+            self.report({'WARNING'}, "Meshオブジェクトが選択されていません")
+            return {'CANCELLED'}
+        if self.frame_end < self.frame_start:
+            self.report({'WARNING'}, "終了フレームが開始フレームより前です")
+            return {'CANCELLED'}
+
+        t = time.perf_counter()
+        frames = np.arange(self.frame_start, self.frame_end + 1, self.frame_step, dtype=np.float64)
+        if frames[-1] != self.frame_end:
+            frames = np.append(frames, self.frame_end)
+        angle_from, angle_to = math.radians(self.angle_from), math.radians(self.angle_to)
+        modifiers = 0
+        skipped = 0
+        for i, obj in enumerate(sel):
+            targets = []
+            for mod in obj.modifiers:
+                if mod.type != 'SIMPLE_DEFORM':
+                    continue
+                if mod.deform_method not in AFFECT_ONLY_MODES:
+                    skipped += 1
+                    continue
+                targets.append(mod)
+            if not targets:
+                continue
+            values = sd_angle_curve(frames, self.frame_start, self.frame_end, angle_from, angle_to,
+                                    self.curve, shift=i * self.object_offset)
+            fcurves = action_fcurves(obj)
+            for mod in targets:
+                key_fcurve_range(fcurves, f'modifiers["{bpy.utils.escape_identifier(mod.name)}"].angle',
+                                 frames, values, _INTERPOLATION_LINEAR)
+                modifiers += 1
+
+        if modifiers == 0:
+            self.report({'WARNING'}, "キーを挿入できませんでした")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"キー挿入: {modifiers}個 x {len(frames)}キー "
+                              f"(F{self.frame_start}-{self.frame_end}, {time.perf_counter() - t:.2f}s)")
+        return {'FINISHED'}
+
 # =========================================================
 # 7) Apply All Modifiers
 # =========================================================
@@ -620,6 +3340,276 @@ def can_apply(obj, mod):
         return False, "Has Shape Keys"
     return True, ""
 
+def apply_all_modifiers(context, objects, make_single_user=True, evaluate_once=False,
+                        keep_shape_keys=False, on_shape_keys=None):
+    """objectsの全Modifierを適用する
+
+    evaluate_once: 適用できるものは評価済みメッシュへの差し替えで一度に適用し (apply_modifiers_evaluated)、
+    残りだけを modifier_apply で1つずつ適用する
+    keep_shape_keys: シェイプキーのあるメッシュはキーごとに評価して残す (apply_modifiers_keep_shapekeys)。
+    on_shape_keys(obj, 統計) はその1オブジェクトごとに呼ぶ
+    戻り値: (適用数, スキップ [(オブジェクト名, 理由)], エラー [文字列])
+    """
+    applied = 0
+    skipped = []
+    errors = []
+    with ensure_object_mode():
+        if evaluate_once:
+            eligible = [obj for obj in objects if can_apply_evaluated(obj)[0]]
+            applied, _created = apply_modifiers_evaluated(context, eligible)
+            eligible = set(eligible)
+            objects = [obj for obj in objects if obj not in eligible]
+        if keep_shape_keys:
+            remaining = []
+            for obj in objects:
+                if obj.type != 'MESH' or not obj.data.shape_keys or not obj.modifiers \
+                        or not can_apply_evaluated(obj, allow_shape_keys=True)[0]:
+                    remaining.append(obj)
+                    continue
+                count = len(obj.modifiers)
+                try:
+                    stats = apply_modifiers_keep_shapekeys(context, obj)
+                except ValueError as e:
+                    errors.append(str(e))
+                    remaining.append(obj)
+                    continue
+                applied += count
+                if on_shape_keys:
+                    on_shape_keys(obj, stats)
+            objects = remaining
+        for obj in objects:
+            if obj.type != 'MESH':
+                skipped.append((obj.name, "Not MESH"))
+                continue
+            context.view_layer.objects.active = obj
+            if make_single_user and obj.data.users > 1:
+                obj.data = obj.data.copy()
+            for mod in reversed(list(obj.modifiers)):
+                ok, reason = can_apply(obj, mod)
+                if not ok:
+                    skipped.append((obj.name, f"{mod.name} ({reason})"))
+                    continue
+                try:
+                    bpy.ops.object.modifier_apply(modifier=mod.name)
+                    applied += 1
+                except RuntimeError as e:
+                    errors.append(f"{obj.name}: {mod.name} -> {e}")
+    return applied, skipped, errors
+
+# ---------------------------------------------------------
+# 7-1) 評価1回での適用
+# ---------------------------------------------------------
+# modifier_apply は1回ごとにスタック全体を評価し直すので、Modifierがn個あればn回評価する。
+# こちらはdepsgraphで評価済みのメッシュを new_from_object で1回だけ取り出して差し替え、スタックを空にする。
+# 結果は (元メッシュ, Modifierの内容) ごとに使い回すので、同じメッシュ・同じスタックのインスタンスは1つのメッシュを共有する。
+def can_apply_evaluated(obj, allow_shape_keys=False):
+    if obj.library or obj.override_library:
+        return False, "Linked/Override object"
+    if obj.type != 'MESH':
+        return False, "Not a MESH"
+    if obj.data.shape_keys and not allow_shape_keys:
+        return False, "Has Shape Keys"
+    if any(not mod.show_viewport for mod in obj.modifiers):
+        return False, "Hidden modifier"
+    return True, ""
+
+def modifier_signature(obj):
+    """結果に効くModifierスタックの内容のハッシュ
+
+    アクティブ・展開状態・persistent_uid などは hash_rna が除くので、同じスタックのインスタンスは同じ値になる。
+    他のオブジェクトを参照するModifier (とジオメトリノード) の結果はオブジェクトの位置にも依存するので、
+    そのときはワールド行列も含める。
+    """
+    h = hashlib.sha1()
+    h.update(repr([vg.name for vg in obj.vertex_groups]).encode())
+    uses_objects = False
+    for mod in obj.modifiers:
+        h.update(f"{mod.type}:{mod.name};".encode())
+        hash_rna(h, mod)
+        for key in mod.keys():
+            h.update(f"{key}={_plain(mod[key])!r};".encode())
+        uses_objects = uses_objects or mod.type == 'NODES' or any(
+            isinstance(getattr(mod, prop.identifier, None), bpy.types.Object)
+            for prop in mod.bl_rna.properties if prop.type == 'POINTER')
+    if uses_objects:
+        h.update(repr([tuple(row) for row in obj.matrix_world]).encode())
+    return h.hexdigest()
+
+def apply_modifiers_evaluated(context, objects, cache=None):
+    """objectsのModifierスタックを、評価済みメッシュへの差し替えで一度に適用する
+
+    cache: {(元メッシュ, modifier_signature): 適用後のメッシュ} (複数回の呼び出しで共有するとき渡す)。
+    キーの元メッシュはキャッシュがある間は消さない (消したメッシュのアドレスを新しいメッシュが再利用すると
+    別のメッシュに当たってしまう)。共有したキャッシュは使い終わったら release_evaluated_cache に渡す。
+    戻り値: (適用したModifier数, 作ったメッシュ数)
+    """
+    shared = cache is not None
+    cache = cache if shared else {}
+    depsgraph = context.evaluated_depsgraph_get()
+    applied = 0
+    created = 0
+    for obj in objects:
+        if not obj.modifiers:
+            continue
+        key = (obj.data, modifier_signature(obj))
+        mesh = cache.get(key)
+        if mesh is None:
+            mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph),
+                                                   preserve_all_data_layers=True, depsgraph=depsgraph)
+            cache[key] = mesh
+            created += 1
+        applied += len(obj.modifiers)
+        obj.data = mesh
+        obj.modifiers.clear()
+    if not shared:
+        release_evaluated_cache(cache)
+    return applied, created
+
+def release_evaluated_cache(cache):
+    """apply_modifiers_evaluated のキャッシュを捨てる
+
+    使われなくなった元メッシュを消してから、適用後のメッシュに元の名前を付ける (FBXに出る名前を変えない)。
+    元メッシュがまだ他で使われていれば、適用後のメッシュはBlenderの連番付きの名前のまま。
+    """
+    renames = [(mesh, old.name) for (old, _signature), mesh in cache.items()]
+    for old in {old for old, _signature in cache}:
+        if old.users == 0:
+            bpy.data.meshes.remove(old)
+    cache.clear()
+    for mesh, name in renames:
+        if name not in bpy.data.meshes:
+            mesh.name = name
+
+def benchmark_apply(context, objects):
+    """一時的な複製で、従来の1つずつの適用と評価1回の適用の所要時間を測る (元のオブジェクトは変えない)
+
+    戻り値: {"従来": 秒, "評価1回": 秒}
+    """
+    collection = context.scene.collection
+    seconds = {}
+    for label in ("従来", "評価1回"):
+        meshes = {}
+        copies = []
+        for obj in objects:
+            copy = obj.copy()
+            if obj.data.name not in meshes:
+                meshes[obj.data.name] = obj.data.copy()
+            copy.data = meshes[obj.data.name]
+            collection.objects.link(copy)
+            copies.append(copy)
+        context.view_layer.update()
+        created = {mesh.name for mesh in meshes.values()}
+        try:
+            t = time.perf_counter()
+            if label == "従来":
+                apply_all_modifiers(context, copies)
+            else:
+                apply_modifiers_evaluated(context, copies)
+            seconds[label] = time.perf_counter() - t
+        finally:
+            created.update(copy.data.name for copy in copies)
+            for copy in copies:
+                bpy.data.objects.remove(copy)
+            for name in created:
+                mesh = bpy.data.meshes.get(name)
+                if mesh is not None and mesh.users == 0:
+                    bpy.data.meshes.remove(mesh)
+    return seconds
+
+# ---------------------------------------------------------
+# 7-2) シェイプキーを残したままの適用
+# ---------------------------------------------------------
+# シェイプキーを1つずつ固定表示 (show_only_shape_key) してスタックを評価し、その頂点位置を
+# 適用後のメッシュのシェイプキーとして入れ直す。評価はキーの数だけ必要なので、キーごとの所要時間を返す。
+_SHAPE_KEY_PROPS = ("interpolation", "mute", "slider_min", "slider_max", "value", "vertex_group")
+
+def _evaluated_topology(mesh):
+    loops = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    return len(mesh.vertices), len(mesh.polygons), loops
+
+def copy_key_animation(src, dst):
+    """Key datablock のアクションとドライバーを引き継ぐ"""
+    anim = src.animation_data
+    if anim is None:
+        return
+    new = dst.animation_data_create()
+    new.action = anim.action
+    if anim.action is not None and getattr(anim, "action_slot", None) is not None:
+        new.action_slot = anim.action_slot
+    for driver in anim.drivers:
+        new.drivers.from_existing(src_driver=driver)
+
+def apply_modifiers_keep_shapekeys(context, obj):
+    """objのModifierを適用し、各シェイプキーにも同じスタックを掛けて残す
+
+    固定表示ではミュートしたキーはBasisとして、頂点グループ付きのキーはマスク済みで評価されるので、
+    評価の間だけ mute / vertex_group を外す (設定は作り直したキーに戻す)。
+    トポロジー (頂点数・面数・ループの頂点番号) がキーごとに変わるスタック (マージ距離の効くMirrorなど) では
+    何も変えずに ValueError を投げる。
+    戻り値: {"keys": キー数, "vertices": 頂点数, "seconds": 評価の合計秒数, "slowest": (キー名, 秒)}
+    """
+    key = obj.data.shape_keys
+    blocks = list(key.key_blocks)
+    saved = obj.show_only_shape_key, obj.active_shape_key_index
+    masks = [(b.mute, b.vertex_group) for b in blocks]
+    coords = None
+    topology = None
+    seconds = []
+    try:
+        for b in blocks:
+            b.mute = False
+            b.vertex_group = ""
+        obj.show_only_shape_key = True
+        for i, block in enumerate(blocks):
+            t = time.perf_counter()
+            obj.active_shape_key_index = i
+            context.view_layer.update()
+            mesh_eval = obj.evaluated_get(context.evaluated_depsgraph_get()).data
+            current = _evaluated_topology(mesh_eval)
+            if topology is None:
+                topology = current
+                coords = np.empty((len(blocks), current[0] * 3), dtype=np.float32)
+            elif current[:2] != topology[:2] or not np.array_equal(current[2], topology[2]):
+                raise ValueError(f"{obj.name}: シェイプキー {block.name} でトポロジーが変わります")
+            mesh_eval.vertices.foreach_get("co", coords[i])
+            seconds.append(time.perf_counter() - t)
+
+        obj.active_shape_key_index = 0
+        context.view_layer.update()
+        depsgraph = context.evaluated_depsgraph_get()
+        mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph),
+                                               preserve_all_data_layers=True, depsgraph=depsgraph)
+    finally:
+        obj.show_only_shape_key, obj.active_shape_key_index = saved
+        for b, (mute, vertex_group) in zip(blocks, masks):
+            b.mute = mute
+            b.vertex_group = vertex_group
+
+    old = obj.data
+    mesh_name = old.name
+    settings = [(b.name, b.relative_key.name, {p: getattr(b, p) for p in _SHAPE_KEY_PROPS}) for b in blocks]
+    obj.data = mesh
+    obj.modifiers.clear()
+    for (name, _, props), co in zip(settings, coords):
+        block = obj.shape_key_add(name=name, from_mix=False)
+        block.data.foreach_set("co", co)
+        for prop, value in props.items():
+            setattr(block, prop, value)
+    new_key = mesh.shape_keys
+    new_key.use_relative = key.use_relative
+    for name, relative, _ in settings:
+        new_key.key_blocks[name].relative_key = new_key.key_blocks[relative]
+    copy_key_animation(key, new_key)
+    if old.users == 0:
+        bpy.data.meshes.remove(old)
+    if mesh_name not in bpy.data.meshes:
+        mesh.name = mesh_name
+
+    slowest = max(range(len(seconds)), key=seconds.__getitem__)
+    return {"keys": len(blocks), "vertices": topology[0], "seconds": sum(seconds),
+            "slowest": (settings[slowest][0], seconds[slowest])}
+
 class OBJECT_OT_apply_all_modifiers_safe(bpy.types.Operator):
     """選択オブジェクトの全Modifierを安全に一括適用"""
     bl_idname = "object.apply_all_modifiers_safe"
@@ -627,40 +3617,44 @@ class OBJECT_OT_apply_all_modifiers_safe(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     make_single_user: bpy.props.BoolProperty(name="Make Mesh Single-User", default=True)
+    evaluate_once: bpy.props.BoolProperty(name="評価1回で適用", description="評価済みメッシュに差し替えてスタックを一度に適用します。同じメッシュ・同じModifierのインスタンスは結果を共有します (シェイプキー・非表示Modifierのあるものは従来通り)", default=True)
+    keep_shape_keys: bpy.props.BoolProperty(name="シェイプキーを残す", description="シェイプキーのあるメッシュは、キーごとにスタックを評価して適用後もシェイプキーを残します (キーの数だけ評価)", default=True)
+    benchmark: bpy.props.BoolProperty(name="計測", description="適用の前に、一時的な複製で従来の方法と評価1回の所要時間を比べます", default=False)
 
     def execute(self, context):
-        applied = 0
-        skipped = []
-        errors = []
         sel = [o for o in context.selected_objects]
         if not sel:
             self.report({'WARNING'}, "オブジェクトが選択されていません")
             return {'CANCELLED'}
 
-        with ensure_object_mode():
-            for obj in sel:
-                if obj.type != 'MESH':
-                    skipped.append((obj.name, "Not MESH"))
-                    continue
-                context.view_layer.objects.active = obj
-                if self.make_single_user and obj.data.users > 1:
-                    obj.data = obj.data.copy()
-                for mod in reversed(list(obj.modifiers)):
-                    ok, reason = can_apply(obj, mod)
-                    if not ok:
-                        skipped.append((obj.name, f"{mod.name} ({reason})"))
-                        continue
-                    try:
-                        bpy.ops.object.modifier_apply(modifier=mod.name)
-                        applied += 1
-                    except RuntimeError as e:
-                        errors.append(f"{obj.name}: {mod.name} -> {e}")
-
-        msg = [f"適用: {applied}個"]
+        bench = None
+        if self.benchmark:
+            meshes = [o for o in sel if o.type == 'MESH' and o.modifiers and can_apply_evaluated(o)[0]]
+            if meshes:
+                with ensure_object_mode():
+                    bench = benchmark_apply(context, meshes)
+        t = time.perf_counter()
+        key_stats = []
+        applied, skipped, errors = apply_all_modifiers(context, sel, self.make_single_user, self.evaluate_once,
+                                                       self.keep_shape_keys,
+                                                       lambda obj, stats: key_stats.append(stats))
+
+        msg = [f"適用: {applied}個 ({time.perf_counter() - t:.2f}s)"]
         if skipped:
             msg.append(f"スキップ: {len(skipped)}個")
         if errors:
             msg.append(f"エラー: {len(errors)}個")
+        if key_stats:
+            keys = sum(st["keys"] for st in key_stats)
+            seconds = sum(st["seconds"] for st in key_stats)
+            name, slowest = max((st["slowest"] for st in key_stats), key=lambda item: item[1])
+            msg.append(f"シェイプキー: {len(key_stats)}オブジェクト {keys}キー "
+                       f"({1000 * seconds / keys:.1f}ms/キー, 最遅 {name} {1000 * slowest:.1f}ms)")
+        for error in errors:
+            self.report({'WARNING'}, error)
+        if bench:
+            ratio = bench["従来"] / bench["評価1回"] if bench["評価1回"] > 0 else 0.0
+            msg.append(f"計測: {format_timings(bench)} ({ratio:.1f}倍)")
         self.report({'INFO'}, " / ".join(msg))
         return {'FINISHED'}
 
@@ -668,9 +3662,324 @@ class OBJECT_OT_apply_all_modifiers_safe(bpy.types.Operator):
 # 8) Naming Tools
 # =========================================================
 
+# 8-0) リネームの計画と一括適用
+# 1つずつ obj.name に代入すると、衝突のたびにBlenderが .001 を付けるので結果が処理順で変わる。
+# ここでは名前の索引を1回だけ作り、全体の計画 (衝突の解決込み) を決めてから、
+# 入れ替え・循環 (A→B, B→A) も崩れないよう仮の名前を経由して一度に適用する。
+MAX_ID_NAME = 63  # IDの名前の最大バイト数 (UTF-8)
+
+def clip_id_name(name):
+    """Blenderが切り詰めるのと同じく、名前を63バイトに収める"""
+    data = name.encode("utf-8")
+    if len(data) <= MAX_ID_NAME:
+        return name
+    return data[:MAX_ID_NAME].decode("utf-8", errors="ignore")
+
+def _numbered_name(base, number):
+    suffix = f".{number:03d}"
+    return base.encode("utf-8")[:MAX_ID_NAME - len(suffix)].decode("utf-8", errors="ignore") + suffix
+
+def plan_renames(collection, wanted, on_conflict='SUFFIX'):
+    """wanted [(ID, 希望の名前)] から、衝突を解決したリネーム計画を作る
+
+    希望の名前が、リネームしないIDの名前や先に並んだ希望とぶつかるとき:
+      SUFFIX: 希望の名前に .001, .002 … の空いている番号を付ける (並び順だけで決まる)
+      SKIP: 元の名前のまま残す。残した名前を希望していた他のIDも同じく残す
+    リンクされたIDは変えない。collection はボーンやModifierのように名前が持ち主ごとのコレクションでもよい。
+    戻り値: (計画 [(ID, 新しい名前)], スキップ [(ID, 希望の名前)])
+    """
+    desired = {}
+    for item, name in wanted:
+        if getattr(item, "library", None) is None:
+            desired[item] = clip_id_name(name)
+    desired = {item: name for item, name in desired.items() if name != item.name}
+    used = {item.name for item in collection if getattr(item, "library", None) is None and item not in desired}
+    claims = {}
+    counters = {}
+    skipped = []
+    for item, name in desired.items():
+        if name in used or name in claims:
+            if on_conflict == 'SKIP':
+                skipped.append(item)
+                continue
+            base = name
+            number = counters.get(base, 0)
+            while name in used or name in claims:
+                number += 1
+                name = _numbered_name(base, number)
+            counters[base] = number
+        claims[name] = item
+
+    # 残したIDの名前は空かないので、その名前を当てにしていた計画も取り消す (1つにつき1回だけ)
+    queue = deque(skipped)
+    while queue:
+        held = queue.popleft().name
+        claimant = claims.pop(held, None)
+        if claimant is not None:
+            skipped.append(claimant)
+            queue.append(claimant)
+    plan = [(item, name) for name, item in claims.items() if name != item.name]
+    return plan, [(item, desired[item]) for item in skipped]
+
+def apply_renames(plan):
+    """plan_renames の計画を適用する。戻り値: 計画と違う名前になったIDの数
+
+    他のIDの新しい名前を今持っているIDだけ、先に仮の名前へ退避させる。
+    """
+    targets = {name for _, name in plan}
+    parked = [item for item, _ in plan if item.name in targets]
+    for i, item in enumerate(parked):
+        item.name = f"\x7f{i:x}\x7f{item.name}"[:MAX_ID_NAME]
+    mismatched = 0
+    for item, name in plan:
+        item.name = name
+        mismatched += item.name != name
+    return mismatched
+
+# オブジェクト以外 (ボーン・マテリアル・メッシュ・アクション・コレクション・Modifier) も同じ計画で変える。
+# 名前の文字列で他を指している参照 (頂点グループ・F-Curveのパス・アクショングループ・スロット名など) は、
+# リネームの前に逆引き {(持ち主, 名前): [参照]} を一度だけ作り、計画を適用した後にまとめて書き換える。
+RENAME_TARGETS = [
+    ('OBJECT', "オブジェクト", "選択オブジェクト"),
+    ('MESH', "メッシュ", "選択オブジェクトのメッシュ"),
+    ('MATERIAL', "マテリアル", "選択オブジェクトのマテリアル"),
+    ('ACTION', "アクション", "選択オブジェクト (とシェイプキー) のアクション"),
+    ('COLLECTION', "コレクション", "選択オブジェクトが入っているコレクション"),
+    ('BONE', "ボーン", "選択アーマチュアのボーン (頂点グループ・アクションのパスも追従)"),
+    ('MODIFIER', "Modifier", "選択オブジェクトのModifier (アクションのパスも追従)"),
+]
+_PATH_PATTERNS = {
+    'BONE': re.compile(r'^pose\.bones\["((?:[^"\\]|\\.)*)"\]'),
+    'MODIFIER': re.compile(r'^modifiers\["((?:[^"\\]|\\.)*)"\]'),
+}
+
+def _unique(items):
+    return list({item.as_pointer(): item for item in items if item is not None}.values())
+
+def rename_scopes(objects, target):
+    """objects から target の種類の対象を集める
+
+    戻り値: [(持ち主, 名前の範囲のコレクション, 対象)]。名前が持ち主ごとに独立するボーン (アーマチュア)・
+    Modifier (オブジェクト) は持ち主ごと、それ以外は持ち主None の1つ
+    """
+    if target == 'BONE':
+        armatures = _unique(o.data for o in objects if o.type == 'ARMATURE')
+        return [(arm, arm.bones, list(arm.bones)) for arm in armatures]
+    if target == 'MODIFIER':
+        return [(obj, obj.modifiers, list(obj.modifiers)) for obj in objects if obj.modifiers]
+    if target == 'MESH':
+        return [(None, bpy.data.meshes, _unique(o.data for o in objects if o.type == 'MESH'))]
+    if target == 'MATERIAL':
+        return [(None, bpy.data.materials, _unique(slot.material for o in objects for slot in o.material_slots))]
+    if target == 'ACTION':
+        owners = [o for o in objects] + [o.data.shape_keys for o in objects if o.type == 'MESH' and o.data.shape_keys]
+        return [(None, bpy.data.actions, _unique(owner.animation_data.action for owner in owners
+                                                 if owner.animation_data))]
+    if target == 'COLLECTION':
+        masters = {scene.collection.as_pointer() for scene in bpy.data.scenes}
+        return [(None, bpy.data.collections, _unique(c for o in objects for c in o.users_collection
+                                                     if c.as_pointer() not in masters))]
+    return [(None, bpy.data.objects, list(objects))]
+
+def iter_action_channels(action):
+    """アクションのF-Curveとグループ (スロット付きアクションは全チャンネルバッグ分)"""
+    if hasattr(action, "layers"):
+        for layer in action.layers:
+            for strip in layer.strips:
+                for bag in getattr(strip, "channelbags", ()):
+                    yield from bag.fcurves
+                    yield from bag.groups
+        return
+    yield from action.fcurves
+    yield from action.groups
+
+class ReferenceIndex:
+    """名前の文字列による参照の逆引き {(持ち主, 名前): [(構造体, 属性, 作った時点の値)]}
+
+    update() は値が作った時点のままの参照だけを書き換えるので、Blender自身が書き換えた参照
+    (割り当て中のアクションのパス、変形に使う頂点グループなど) を二重に変えない。
+    """
+
+    def __init__(self):
+        self.refs = {}
+        self.ambiguous = []
+
+    def add(self, owner, name, struct, attr):
+        self.refs.setdefault((owner, name), []).append((struct, attr, getattr(struct, attr)))
+
+    def update(self, renames):
+        """renames {(持ち主, 元の名前): 新しい名前} に合わせて書き換える。戻り値: 書き換えた参照の数
+
+        名前 (頂点グループ・グループ・スロット) は入れ替えでぶつからないよう仮の名前を経由する。
+        """
+        paths = []
+        names = []
+        for key, new in renames.items():
+            for struct, attr, old_value in self.refs.get(key, ()):
+                if getattr(struct, attr) != old_value:
+                    continue
+                if attr == "data_path":
+                    old = bpy.utils.escape_identifier(key[1])
+                    paths.append((struct, old_value.replace(f'["{old}"]', f'["{bpy.utils.escape_identifier(new)}"]', 1)))
+                else:
+                    names.append((struct, attr, new))
+        for fcurve, path in paths:
+            fcurve.data_path = path
+        for i, (struct, attr, _) in enumerate(names):
+            setattr(struct, attr, f"\x7f{i:x}\x7f")
+        for struct, attr, new in names:
+            setattr(struct, attr, new)
+        return len(paths) + len(names)
+
+def _path_names(action, pattern):
+    found = set()
+    for channel in iter_action_channels(action):
+        m = pattern.match(getattr(channel, "data_path", ""))
+        if m:
+            found.add(bpy.utils.unescape_identifier(m.group(1)))
+    return found
+
+def build_reference_index(target, scopes):
+    """target の種類のリネームで追従が要る参照の逆引きを作る (全アクション・対象の持ち主を一度ずつ走査)
+
+    割り当て (NLAを含む) のあるアクションは割り当て先の持ち主のもの。割り当てのないアクションは、
+    パスに出てくる名前が全部そろう持ち主がファイル中に1つだけのときだけ、その持ち主のものとみなす。
+    同じボーン名のリグが複数あるなど候補が2つ以上で、対象の持ち主が含まれるものは書き換えず ambiguous に残す。
+    """
+    index = ReferenceIndex()
+    if target == 'OBJECT':
+        for _, _, objects in scopes:
+            for obj in objects:
+                slot = getattr(obj.animation_data, "action_slot", None) if obj.animation_data else None
+                if slot is not None and slot.name_display == obj.name:
+                    index.add(None, obj.name, slot, "name_display")
+        return index
+    if target not in _PATH_PATTERNS:
+        return index
+
+    pattern = _PATH_PATTERNS[target]
+    assigned = {}
+    for obj in bpy.data.objects:
+        anim = obj.animation_data
+        if anim is None or (target == 'BONE' and obj.type != 'ARMATURE'):
+            continue
+        owner = obj.data if target == 'BONE' else obj
+        for action in [anim.action] + [strip.action for track in anim.nla_tracks for strip in track.strips]:
+            if action is not None:
+                assigned.setdefault(action.as_pointer(), set()).add(owner.as_pointer())
+    action_names = [(action, _path_names(action, pattern)) for action in bpy.data.actions if action.library is None]
+    if target == 'BONE':
+        candidates = [(arm.as_pointer(), {bone.name for bone in arm.bones}) for arm in bpy.data.armatures]
+    else:
+        candidates = [(obj.as_pointer(), {mod.name for mod in obj.modifiers}) for obj in bpy.data.objects]
+    in_scope = {owner.as_pointer() for owner, _, _ in scopes}
+    unassigned = {}
+    for action, used in action_names:
+        if not used or action.as_pointer() in assigned:
+            continue
+        owners = [ptr for ptr, names in candidates if used <= names]
+        if len(owners) == 1:
+            unassigned[action.as_pointer()] = owners[0]
+        elif in_scope.intersection(owners):
+            index.ambiguous.append(action.name)
+    deformed = {}
+    if target == 'BONE':
+        for obj in bpy.data.objects:
+            if obj.type != 'MESH' or obj.library is not None:
+                continue
+            rigs = {mod.object.data.as_pointer() for mod in obj.modifiers
+                    if mod.type == 'ARMATURE' and mod.object is not None and mod.object.type == 'ARMATURE'}
+            if obj.parent is not None and obj.parent.type == 'ARMATURE':
+                rigs.add(obj.parent.data.as_pointer())
+            for rig in rigs:
+                deformed.setdefault(rig, []).append(obj)
+    for owner, _, items in scopes:
+        names = {item.name for item in items}
+        for action, used in action_names:
+            users = assigned.get(action.as_pointer())
+            if not used or (owner.as_pointer() not in users if users
+                            else unassigned.get(action.as_pointer()) != owner.as_pointer()):
+                continue
+            for channel in iter_action_channels(action):
+                m = pattern.match(getattr(channel, "data_path", ""))
+                if m:
+                    index.add(owner, bpy.utils.unescape_identifier(m.group(1)), channel, "data_path")
+                elif target == 'BONE' and isinstance(channel, bpy.types.ActionGroup) and channel.name in names:
+                    index.add(owner, channel.name, channel, "name")
+        for obj in deformed.get(owner.as_pointer(), ()):
+            for group in obj.vertex_groups:
+                if group.name in names:
+                    index.add(owner, group.name, group, "name")
+            for mod in obj.modifiers:
+                for prop in mod.bl_rna.properties:
+                    if prop.type == 'STRING' and prop.identifier.startswith("vertex_group") \
+                            and getattr(mod, prop.identifier) in names:
+                        index.add(owner, getattr(mod, prop.identifier), mod, prop.identifier)
+    return index
+
+def rename_targets(objects, target, name_fn, on_conflict='SUFFIX', dry_run=False):
+    """objects から集めた target の種類の対象を name_fn(名前) の名前にする (参照も追従)
+
+    name_fn が None か空文字を返したものは変えない。編集モードのボーンを確定させるため、オブジェクトモードで行う。
+    戻り値: {"plan": [(元の名前, 新しい名前)], "skipped": [(元の名前, 希望の名前)], "renamed": 変更数,
+            "mismatched": 計画と違う名前になった数, "references": 書き換えた参照の数,
+            "ambiguous": 持ち主を決められず書き換えなかった未割り当てアクションの名前}
+    """
+    result = {"plan": [], "skipped": [], "renamed": 0, "mismatched": 0, "references": 0, "ambiguous": []}
+    with ensure_object_mode():
+        scopes = rename_scopes(objects, target)
+        plans = []
+        for owner, collection, items in scopes:
+            wanted = []
+            for item in sorted(items, key=lambda i: i.name):
+                name = name_fn(item.name)
+                if name:
+                    wanted.append((item, name))
+            plan, skipped = plan_renames(collection, wanted, on_conflict)
+            plans.append((owner, plan))
+            result["plan"] += [(item.name, name) for item, name in plan]
+            result["skipped"] += [(item.name, name) for item, name in skipped]
+        if dry_run:
+            return result
+
+        index = build_reference_index(target, scopes)
+        renames = {(owner, item.name): name for owner, plan in plans for item, name in plan}
+        for _, plan in plans:
+            result["mismatched"] += apply_renames(plan)
+            result["renamed"] += len(plan)
+        result["references"] = index.update(renames)
+        result["ambiguous"] = sorted(index.ambiguous)
+    return result
+
+RENAME_PREVIEW_ROWS = 8
+_rename_preview = {}
+
+def last_rename_preview():
+    """パネル表示用の直前のプレビュー (無ければ空のdict)"""
+    return _rename_preview
+
+def finish_rename(op, result, dry_run=False):
+    """rename_targets の結果を報告し、プレビューを残す"""
+    _rename_preview.clear()
+    if dry_run:
+        _rename_preview.update(result)
+        op.report({'INFO'}, f"プレビュー: 変更 {len(result['plan'])}個 / スキップ {len(result['skipped'])}個")
+        return {'FINISHED'}
+    msg = f"{result['renamed']}個の名前を変更"
+    if result.get("references"):
+        msg += f" (参照 {result['references']}個を追従)"
+    if result["skipped"]:
+        msg += f" / スキップ: {len(result['skipped'])}個"
+    if result["mismatched"]:
+        msg += f" / 計画と異なる名前: {result['mismatched']}個"
+    op.report({'INFO'}, msg)
+    if result.get("ambiguous"):
+        op.report({'WARNING'}, "持ち主が複数考えられるため追従しなかったアクション: " + ", ".join(result["ambiguous"]))
+    return {'FINISHED'}
+
 # 8-1) Batch Rename (Prefix/Suffix)
 class OBJECT_OT_batch_rename(bpy.types.Operator):
-    """選択したオブジェクトに一括でPrefix/Suffixを追加"""
+    """選択したオブジェクト (または対象の種類) の名前に一括でPrefix/Suffixを追加"""
     bl_idname = "object.batch_rename"
     bl_label = "Apply"
     bl_options = {'REGISTER', 'UNDO'}
@@ -685,15 +3994,13 @@ class OBJECT_OT_batch_rename(bpy.types.Operator):
             self.report({'WARNING'}, "追加する文字列を入力してください")
             return {'CANCELLED'}
 
-        count = 0
-        for obj in context.selected_objects:
-            if rename_props.mode == 'PREFIX':
-                obj.name = rename_props.text + obj.name
-            else:
-                obj.name = obj.name + rename_props.text
-            count += 1
-        self.report({'INFO'}, f"{count}個のオブジェクト名を変更しました")
-        return {'FINISHED'}
+        text = rename_props.text
+        if rename_props.mode == 'PREFIX':
+            name_fn = lambda name: text + name
+        else:
+            name_fn = lambda name: name + text
+        return finish_rename(self, rename_targets(context.selected_objects, rename_props.target, name_fn,
+                                                  rename_props.on_conflict))
 
 class BatchRenameProperties(bpy.types.PropertyGroup):
     mode: bpy.props.EnumProperty(
@@ -705,6 +4012,17 @@ class BatchRenameProperties(bpy.types.PropertyGroup):
         default='PREFIX'
     )
     text: bpy.props.StringProperty(name="追加する文字列", default="")
+    target: bpy.props.EnumProperty(name="対象", items=RENAME_TARGETS, default='OBJECT')
+    pattern: bpy.props.StringProperty(name="検索 (正規表現)", default="")
+    replacement: bpy.props.StringProperty(name="置換", description="\\1 などで検索のグループを参照できます", default="")
+    on_conflict: bpy.props.EnumProperty(
+        name="同名の扱い",
+        items=[
+            ('SUFFIX', ".001を付ける", "ぶつかる名前には空いている番号を付ける (名前順で決まる)"),
+            ('SKIP', "スキップ", "ぶつかるものは名前を変えない"),
+        ],
+        default='SUFFIX'
+    )
 
 # 8-2) Append .R/.L
 def strip_side_suffix(name: str) -> str:
@@ -713,7 +4031,7 @@ def strip_side_suffix(name: str) -> str:
     return name
 
 class OBJECT_OT_append_side_suffix(bpy.types.Operator):
-    """オブジェクト名に.R/.Lを追加"""
+    """名前に.R/.Lを追加 (対象の種類)"""
     bl_idname = "object.append_side_suffix"
     bl_label = "Append .R/.L"
     bl_options = {"REGISTER", "UNDO"}
@@ -730,22 +4048,16 @@ class OBJECT_OT_append_side_suffix(bpy.types.Operator):
 
     def execute(self, context):
         suffix = f".{self.side}"
-        renamed = 0
-        for obj in context.selected_objects:
-            base = obj.name
-            if self.replace_existing:
-                base = strip_side_suffix(base)
-            if base.endswith("."):
-                base = base.rstrip(".")
-            new_name = base + suffix
-            if obj.name != new_name:
-                try:
-                    obj.name = new_name
-                    renamed += 1
-                except Exception as e:
-                    self.report({"WARNING"}, f"Failed to rename {obj.name}: {e}")
-        self.report({"INFO"}, f"{renamed}個のオブジェクト名を変更")
-        return {"FINISHED"}
+        replace_existing = self.replace_existing
+
+        def name_fn(name):
+            if replace_existing:
+                name = strip_side_suffix(name)
+            return name.rstrip(".") + suffix
+
+        rename_props = context.scene.batch_rename_props
+        return finish_rename(self, rename_targets(context.selected_objects, rename_props.target, name_fn,
+                                                  rename_props.on_conflict))
 
 # 8-3) Remove Numeric Suffix (.001/.002)
 _NUM_SUFFIX_RE = re.compile(r"\.(\d+)$")
@@ -754,7 +4066,7 @@ def strip_numeric_suffix(name: str) -> str:
     return _NUM_SUFFIX_RE.sub("", name)
 
 class OBJECT_OT_remove_numeric_suffix(bpy.types.Operator):
-    """末尾の.001/.002を削除"""
+    """名前の末尾の.001/.002を削除 (対象の種類)"""
     bl_idname = "object.remove_numeric_suffix"
     bl_label = "Remove .001/.002"
     bl_options = {"REGISTER", "UNDO"}
@@ -765,63 +4077,455 @@ class OBJECT_OT_remove_numeric_suffix(bpy.types.Operator):
     def _gather_targets(self, context):
         if not self.include_children:
             return list(context.selected_objects)
+        children_index = build_children_index(bpy.data.objects)
         seen = set()
-        queue = list(context.selected_objects)
+        queue = deque(context.selected_objects)
         out = []
         while queue:
-            obj = queue.pop(0)
+            obj = queue.popleft()
             if obj in seen:
                 continue
             seen.add(obj)
             out.append(obj)
-            queue.extend(list(obj.children))
+            queue.extend(children_index.get(obj, ()))
         return out
 
     def execute(self, context):
-        targets = self._gather_targets(context)
-        scene_names = {obj.name for obj in bpy.data.objects}
-        renamed = 0
-        skipped = 0
-        unchanged = 0
-
-        for obj in targets:
-            base = strip_numeric_suffix(obj.name)
-            if base == obj.name:
-                unchanged += 1
-                continue
-            if self.skip_conflicts and base in scene_names and base != obj.name:
-                skipped += 1
-                continue
-            try:
-                obj.name = base
-                renamed += 1
-                scene_names.add(base)
-            except Exception as e:
-                self.report({"WARNING"}, f"Failed to rename {obj.name}: {e}")
-
-        self.report({"INFO"}, f"変更: {renamed}個 / スキップ: {skipped}個")
-        return {"FINISHED"}
+        return finish_rename(self, rename_targets(self._gather_targets(context),
+                                                  context.scene.batch_rename_props.target, strip_numeric_suffix,
+                                                  'SKIP' if self.skip_conflicts else 'SUFFIX'))
 
 # 8-4) Remove until 2nd Hyphen
 class OBJECT_OT_remove_prefix_until_2nd_hyphen(bpy.types.Operator):
-    """名前の先頭から2つ目のハイフンまで削除"""
+    """名前の先頭から2つ目のハイフンまで削除 (対象の種類)"""
     bl_idname = "object.remove_prefix_until_2nd_hyphen"
     bl_label = "Remove Until 2nd '-'"
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        count = 0
-        for obj in context.selected_objects:
-            name = obj.name
+        def name_fn(name):
             first = name.find("-")
             if first != -1:
                 second = name.find("-", first + 1)
                 if second != -1:
-                    new_name = name[second+1:]
-                    obj.name = new_name
-                    count += 1
-        self.report({'INFO'}, f"{count}個のオブジェクト名を変更")
-        return {'FINISHED'}
+                    return name[second+1:]
+            return None
+
+        rename_props = context.scene.batch_rename_props
+        return finish_rename(self, rename_targets(context.selected_objects, rename_props.target, name_fn,
+                                                  rename_props.on_conflict))
+
+# 8-5) Regex Rename
+class OBJECT_OT_regex_rename(bpy.types.Operator):
+    """対象の種類の名前を正規表現で置換 (プレビュー可)"""
+    bl_idname = "object.regex_rename"
+    bl_label = "Regex Rename"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    dry_run: bpy.props.BoolProperty(name="プレビューのみ", default=False)
+
+    def execute(self, context):
+        rename_props = context.scene.batch_rename_props
+        if not context.selected_objects:
+            self.report({'WARNING'}, "オブジェクトが選択されていません")
+            return {'CANCELLED'}
+        try:
+            pattern = re.compile(rename_props.pattern)
+            result = rename_targets(context.selected_objects, rename_props.target,
+                                    lambda name: pattern.sub(rename_props.replacement, name),
+                                    rename_props.on_conflict, dry_run=self.dry_run)
+        except re.error as e:
+            self.report({'ERROR'}, f"正規表現が不正です: {e}")
+            return {'CANCELLED'}
+        return finish_rename(self, result, self.dry_run)
+
+# =========================================================
+# 9) ジョブキュー (モーダル実行・進捗・キャンセル)
+# =========================================================
+# 書き出し/レンダリングの本体はステップごとに (完了数, 総数) をyieldするジェネレーター。
+# キュー実行ではモーダルオペレーターがタイマーごとに少しずつ進め、Escでclose()して
+# 各ジェネレーターのfinally (選択・移動したトランスフォーム・レンダー設定の復元) を走らせる。
+class QueuedJob:
+    """キューに積まれた1バッチ
+
+    changed: 進捗を1回でも返したか。対象なし・検証エラーなどで最初の進捗より前に終わったジョブは
+    データを変えていないので、アンドゥの区切りを積まない。
+    """
+
+    def __init__(self, label, make_steps):
+        self.label = label
+        self.messages = []
+        self.done = 0
+        self.total = 0
+        self.changed = False
+        self.started = None
+        self.make_steps = make_steps
+        self.steps = None
+
+    def start(self):
+        """実行の番が来たときにステップ用ジェネレーターを作る (オブジェクトの解決はこの時点で行う)"""
+        self.started = time.perf_counter()
+        self.steps = self.make_steps(self.report)
+
+    def report(self, type, message):
+        self.messages.append((type, message))
+
+_job_queue = deque()
+_job_status = {"running": False, "label": "", "done": 0, "total": 0, "elapsed": 0.0, "eta": None, "undone": False}
+
+@bpy.app.handlers.persistent
+def _on_undo_redo(*_args):
+    """実行中のジョブが持っているIDはアンドゥ/リドゥで作り直されるので、次のタイマーで中止させる"""
+    if _job_status["running"]:
+        _job_status["undone"] = True
+
+def use_job_queue(context):
+    return getattr(context.scene, "forunity_use_job_queue", False) and context.window is not None
+
+def enqueue_job(label, make_steps):
+    """キューの末尾に積む。make_steps(report) は実行の番が来たときに呼んでジェネレーターを作る
+
+    積んでから実行までにアンドゥなどでIDが作り直されることがあるので、オブジェクトは名前で渡し
+    make_steps の中で解決する。
+    """
+    _job_queue.append(QueuedJob(label, make_steps))
+    if not _job_status["running"]:
+        bpy.ops.forunity.run_job_queue('INVOKE_DEFAULT')
+
+def estimate_eta(done, total, elapsed):
+    """これまでの平均速度から残り秒数を見積もる (まだ見積もれなければNone)"""
+    if done <= 0 or total <= 0:
+        return None
+    return elapsed * (total - done) / done
+
+def format_progress(status):
+    """"ラベル: 完了/総数 経過 12.3s 残り 45.6s" の形の進捗表示"""
+    text = f"{status['label']}: {status['done']}/{status['total']} 経過 {status['elapsed']:.1f}s"
+    if status["eta"] is not None:
+        text += f" 残り {status['eta']:.1f}s"
+    return text
+
+def job_queue_status():
+    """パネル表示用の状態 (実行中でなければNone)"""
+    if not _job_status["running"]:
+        return None
+    return dict(_job_status, queued=len(_job_queue))
+
+class FORUNITY_OT_run_job_queue(bpy.types.Operator):
+    """キューのバッチを順に実行 (Escでキャンセル)"""
+    bl_idname = "forunity.run_job_queue"
+    bl_label = "Run Job Queue"
+    bl_options = {'INTERNAL'}
+
+    _timer = None
+    _job = None
+
+    def invoke(self, context, event):
+        if _job_status["running"] or not _job_queue:
+            return {'CANCELLED'}
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.05, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, 100)
+        _job_status["running"] = True
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            cancelled = self._cancel_all()
+            self._finish(context)
+            self.report({'WARNING'}, f"キャンセルしました ({cancelled}件のバッチを中止)")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        if _job_status["undone"]:
+            _job_status["undone"] = False
+            if self._job is not None:
+                self.report({'WARNING'}, f"{self._job.label}: アンドゥ/リドゥされたので中止しました")
+                self._close(self._job)
+                self._flush(self._job)
+                self._job = None
+
+        if self._job is None:
+            if not _job_queue:
+                self._finish(context)
+                return {'FINISHED'}
+            self._job = _job_queue.popleft()
+            self._job.start()
+            _job_status.update(label=self._job.label, done=0, total=0, elapsed=0.0, eta=None)
+
+        job = self._job
+        deadline = time.perf_counter() + 0.1
+        try:
+            while time.perf_counter() < deadline:
+                progress = next(job.steps)
+                if progress:
+                    job.done, job.total = progress
+                    job.changed = True
+        except StopIteration:
+            self._flush(job)
+            self._job = None
+            if job.changed:
+                bpy.ops.ed.undo_push(message=job.label)
+        except Exception as e:
+            self._flush(job)
+            self.report({'ERROR'}, f"{job.label}: {e}")
+            self._job = None
+            if job.changed:
+                # 途中までの変更を次の操作のアンドゥに混ぜず、単独で戻せるようにする
+                bpy.ops.ed.undo_push(message=f"{job.label} (エラーで中断)")
+
+        elapsed = time.perf_counter() - job.started
+        _job_status.update(done=job.done, total=job.total, elapsed=elapsed,
+                           eta=estimate_eta(job.done, job.total, elapsed))
+        context.window_manager.progress_update(100 * job.done / job.total if job.total else 0)
+        if context.workspace:
+            context.workspace.status_text_set(f"{format_progress(_job_status)} (Escで中止)")
+        for area in context.screen.areas if context.screen else ():
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        return {'RUNNING_MODAL'}
+
+    def cancel(self, context):
+        self._cancel_all()
+        self._finish(context)
+
+    def _cancel_all(self):
+        cancelled = 0
+        if self._job is not None:
+            self._close(self._job)
+            self._flush(self._job)
+            self._job = None
+            cancelled += 1
+        cancelled += len(_job_queue)
+        _job_queue.clear()  # 未開始のジョブはまだジェネレーターを作っていない
+        return cancelled
+
+    def _close(self, job):
+        try:
+            job.steps.close()
+        except ReferenceError:
+            pass  # アンドゥで消えたIDの後始末は不要 (状態ごと戻っている)
+
+    def _flush(self, job):
+        for type, message in job.messages:
+            self.report(type, message)
+        job.messages.clear()
+
+    def _finish(self, context):
+        wm = context.window_manager
+        if self._timer is not None:
+            wm.event_timer_remove(self._timer)
+            self._timer = None
+        wm.progress_end()
+        if context.workspace:
+            context.workspace.status_text_set(None)
+        _job_status.update(running=False, label="", done=0, total=0, elapsed=0.0, eta=None, undone=False)
+        for area in context.screen.areas if context.screen else ():
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+# =========================================================
+# 10) コマンドライン実行 (blender -b)
+# =========================================================
+# 1ファイル:
+#   blender -b file.blend --python UnityMatome.py -- --config build.json --to-unity --apply-modifiers --export-dir out/
+# ドライバー (フォルダ内の.blendを並列処理):
+#   blender -b --python UnityMatome.py -- --drive blends/ --jobs 4 --export-dir out/ --summary summary.json
+#
+# --config のJSONはコマンドラインと同じキー (to_unity, apply_modifiers, export_dir, objects,
+# include_children, include_parent_armature, workers, unity_assets_dir) と、
+# シーン設定 "scene": {"export_animation": true, ...} (forunity_ を除いた名前) を持てる。
+CLI_DEFAULTS = {
+    "to_unity": False,
+    "apply_modifiers": False,
+    "export_dir": "//",
+    "objects": None,
+    "include_children": True,
+    "include_parent_armature": True,
+    "workers": max(1, min(8, (os.cpu_count() or 2) - 1)),
+    "unity_assets_dir": "",
+    "scene": {},
+}
+
+def _cli_parser():
+    parser = argparse.ArgumentParser(prog="UnityMatome.py", description="ForUnity batch export")
+    parser.add_argument("--config", help="JSON設定ファイル")
+    parser.add_argument("--to-unity", dest="to_unity", action="store_true", default=None)
+    parser.add_argument("--apply-modifiers", dest="apply_modifiers", action="store_true", default=None)
+    parser.add_argument("--export-dir", dest="export_dir")
+    parser.add_argument("--objects", nargs="+", help="書き出すオブジェクト名 (省略時は選択中、無ければルートオブジェクト全て)")
+    parser.add_argument("--summary", help="結果JSONの書き出し先 (省略時は標準出力)")
+    parser.add_argument("--drive", metavar="DIR", help="DIR内の.blendをプロセスプールで処理する")
+    parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="ドライバーの同時実行数")
+    parser.add_argument("--timeout", type=float, default=None, help="ドライバー: 1ファイルの制限時間 (秒)")
+    return parser
+
+def load_cli_config(args):
+    """CLI_DEFAULTS ← --config のJSON ← コマンドライン引数 の順で上書きした設定"""
+    config = dict(CLI_DEFAULTS)
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            config.update(json.load(f))
+    for key in ("to_unity", "apply_modifiers", "export_dir", "objects"):
+        value = getattr(args, key)
+        if value is not None:
+            config[key] = value
+    return config
+
+def _cli_targets(context, names):
+    if names:
+        missing = [n for n in names if n not in bpy.data.objects]
+        if missing:
+            raise KeyError(f"Object not found: {', '.join(missing)}")
+        return [bpy.data.objects[n] for n in names]
+    sel = list(context.selected_objects)
+    if sel:
+        return sel
+    return [o for o in context.view_layer.objects if o.parent is None and o.type in FBX_OBJECT_TYPES]
+
+def run_cli_file(config):
+    """開いている.blendに対して To Unity → Apply Modifiers → FBX書き出し を実行し、結果辞書を返す"""
+    if not hasattr(bpy.types.Scene, "forunity_export_animation"):
+        bpy.utils.register_class(BatchRenameProperties)
+        register_scene_props()
+    context = bpy.context
+    scene = context.scene
+    for key, value in config["scene"].items():
+        setattr(scene, "forunity_" + key, value)
+    messages = []
+    summary = {"blend": bpy.data.filepath, "ok": False, "steps": {}, "messages": messages}
+
+    def report(level, text):
+        messages.append({"level": sorted(level)[0], "message": text})
+
+    try:
+        with ensure_object_mode():
+            roots = _cli_targets(context, config["objects"])
+            children_index = build_children_index(context.view_layer.objects)
+            meshes = {o for root in roots
+                      for o in collect_unit_objects(root, config["include_children"], False, children_index)
+                      if o.type == 'MESH'}
+            if config["to_unity"]:
+                processed, baked, skipped, timings = bake_unity_transforms(list(meshes))
+                summary["steps"]["to_unity"] = {"objects": processed, "meshes": baked,
+                                                "skipped": skipped, "timings": timings}
+            if config["apply_modifiers"]:
+                t = time.perf_counter()
+                applied, skipped, errors = apply_all_modifiers(context, list(meshes), evaluate_once=True,
+                                                               keep_shape_keys=True)
+                summary["steps"]["apply_modifiers"] = {"applied": applied, "skipped": skipped,
+                                                       "errors": errors, "seconds": time.perf_counter() - t}
+                for error in errors:
+                    report({'ERROR'}, error)
+            prefs = SimpleNamespace(export_base_dir=config["export_dir"], export_workers=config["workers"],
+                                    unity_assets_dir=config["unity_assets_dir"])
+            _export_summary.clear()
+            run_steps(iter_export_batch(context, roots, config["include_children"],
+                                        config["include_parent_armature"], report, prefs=prefs))
+            summary["steps"]["export"] = dict(_export_summary)
+        summary["ok"] = not any(m["level"] == 'ERROR' for m in messages)
+    except Exception as e:
+        report({'ERROR'}, f"{type(e).__name__}: {e}")
+    return summary
+
+def iter_cli_drive(blend_paths, argv, jobs, export_dir, timeout=None):
+    """.blendごとに blender -b を起動し、同時実行数 jobs で回す。1ファイル終わるごとに結果辞書をyieldする
+
+    argv: 各ファイルに渡すCLI引数 (--drive/--summary/--export-dir は除いたもの)
+    export_dir: 指定時はファイル名ごとのサブフォルダへ書き出す
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="forunity_drive_")
+    pending = deque(enumerate(blend_paths))
+    running = []
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                i, blend = pending.popleft()
+                summary_path = os.path.join(tmp_dir, f"summary_{i}.json")
+                log_path = os.path.join(tmp_dir, f"blend_{i}.log")
+                cmd = [bpy.app.binary_path, "-b", "--factory-startup", blend,
+                       "--python", os.path.abspath(__file__), "--", *argv, "--summary", summary_path]
+                if export_dir:
+                    stem = os.path.splitext(os.path.basename(blend))[0]
+                    cmd += ["--export-dir", os.path.join(export_dir, sanitize_filename(stem))]
+                log = open(log_path, "w", encoding="utf-8")
+                proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+                running.append((blend, summary_path, log_path, log, proc, time.perf_counter()))
+            for entry in list(running):
+                blend, summary_path, log_path, log, proc, start = entry
+                if proc.poll() is None:
+                    if timeout is None or time.perf_counter() - start < timeout:
+                        continue
+                    proc.kill()
+                    proc.wait()
+                running.remove(entry)
+                log.close()
+                yield _collect_drive_result(blend, summary_path, log_path, proc, time.perf_counter() - start)
+            if running:
+                try:
+                    running[0][4].wait(timeout=0.1)
+                except subprocess.TimeoutExpired:
+                    pass
+    finally:
+        for *_info, log, proc, _start in running:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            log.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def _collect_drive_result(blend, summary_path, log_path, proc, seconds):
+    if os.path.exists(summary_path):
+        with open(summary_path, encoding="utf-8") as f:
+            result = json.load(f)
+    else:
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            tail = f.read()[-500:].strip()
+        result = {"ok": False, "steps": {}, "messages": [{"level": "ERROR", "message": tail}]}
+    result.update(blend=blend, returncode=proc.returncode, seconds=seconds)
+    if proc.returncode != 0:
+        result["ok"] = False
+    return result
+
+def _write_cli_summary(path, data):
+    text = json.dumps(data, ensure_ascii=False, indent=1, default=str)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+def cli_main(argv):
+    """コマンドラインの入口。終了コード (全て成功なら0) を返す"""
+    args = _cli_parser().parse_args(argv)
+    if args.drive:
+        blends = sorted(os.path.join(args.drive, n) for n in os.listdir(args.drive) if n.endswith(".blend"))
+        child_argv = []
+        if args.config:
+            child_argv += ["--config", os.path.abspath(args.config)]
+        if args.to_unity:
+            child_argv.append("--to-unity")
+        if args.apply_modifiers:
+            child_argv.append("--apply-modifiers")
+        if args.objects:
+            child_argv += ["--objects", *args.objects]
+        export_dir = os.path.abspath(args.export_dir) if args.export_dir else None
+        t = time.perf_counter()
+        files = []
+        for result in iter_cli_drive(blends, child_argv, max(1, args.jobs), export_dir, args.timeout):
+            files.append(result)
+            print(f"[{len(files)}/{len(blends)}] {'OK ' if result['ok'] else 'NG '} "
+                  f"{os.path.basename(result['blend'])} ({result['seconds']:.1f}s)")
+        failed = sum(1 for r in files if not r["ok"])
+        _write_cli_summary(args.summary, {"files": files, "failed": failed, "jobs": args.jobs,
+                                          "seconds": time.perf_counter() - t})
+        return 1 if failed else 0
+
+    summary = run_cli_file(load_cli_config(args))
+    _write_cli_summary(args.summary, summary)
+    return 0 if summary["ok"] else 1
 
 # =========================================================
 # UI Panel (統合版シンプルUI)
@@ -850,9 +4554,37 @@ class FORUNITY_PT_main_unified(bpy.types.Panel):
         box.operator("forunity.set_export_dir", text="変更", icon='FILE_FOLDER')
 
         box.prop(scene, "forunity_export_animation", text="Animation")
+        if scene.forunity_export_animation:
+            box.prop(scene, "forunity_export_group_armature", text="アーマチュア単位でまとめる")
         if hasattr(scene, "forunity_export_move_to_origin"):
             box.prop(scene, "forunity_export_move_to_origin", text="原点で書き出し")
+        row = box.row(align=True)
+        row.prop(scene, "forunity_export_parallel", text="並列書き出し")
+        row.label(text=f"x{prefs.export_workers}")
+        box.prop(scene, "forunity_export_incremental", text="変更分のみ書き出し")
+        row = box.row(align=True)
+        row.prop(scene, "forunity_export_native", text="高速ライター (静的メッシュ)")
+        sub = row.row(align=True)
+        sub.active = scene.forunity_export_native
+        sub.prop(scene, "forunity_export_native_benchmark", text="計測")
+        row = box.row(align=True)
+        row.prop(scene, "forunity_post_copy", text="Unityへコピー")
+        row.prop(scene, "forunity_post_archive", text="zip")
         box.operator("forunity.export_selected_fbx", icon='EXPORT')
+        box.prop(scene, "forunity_export_report", text="レポート (JSON/CSV)")
+        summary = last_export_summary()
+        if summary:
+            col = box.column(align=True)
+            col.label(text=f"前回: {summary['units']}個 {summary['seconds']:.1f}s / "
+                           f"{summary['mb_per_sec']:.1f} MB/s", icon='INFO')
+            for item in summary["slowest"]:
+                col.label(text=f"  {item['object']}: {item['seconds']:.2f}s")
+        box.prop(scene, "forunity_use_job_queue", text="バックグラウンド実行 (キュー)")
+        status = job_queue_status()
+        if status:
+            row = box.row()
+            row.label(text=format_progress(status), icon='TIME')
+            row.label(text=f"待機 {status['queued']} / Escで中止")
 
         # === 2) EEVEE Render ===
         box = layout.box()
@@ -884,6 +4616,13 @@ class FORUNITY_PT_main_unified(bpy.types.Panel):
         row = box.row(align=True)
         row.operator("forunity.bake_modifier_to_shapekeys", text="Bake", icon='KEYFRAME_HLT')
         row.operator("forunity.clear_baked_shapekeys", text="Clear", icon='X')
+        row = box.row(align=True)
+        row.operator("forunity.bake_modifier_to_vat", text="Bake VAT", icon='TEXTURE')
+        row.operator("forunity.bake_modifier_to_pc2", text="Bake PC2", icon='FILE_CACHE')
+        row.operator("forunity.load_pc2", text="Load PC2", icon='IMPORT')
+        box.operator("forunity.bake_selected_modifiers", text="Bake Selected (1 Sweep)", icon='RENDER_ANIMATION')
+        box.operator("forunity.compress_baked_shapekeys", text="Compress (PCA)", icon='MOD_DECIM')
+        box.prop(scene, "forunity_use_job_queue", text="バックグラウンド実行 (キュー)")
 
         # === 5) Simple Deform Angle Key ===
         box = layout.box()
@@ -891,6 +4630,7 @@ class FORUNITY_PT_main_unified(bpy.types.Panel):
         row = box.row(align=True)
         row.operator("forunity.sd_angle_key_current", icon='KEY_HLT')
         row.operator("forunity.sd_angle_key_set", icon='KEYTYPE_KEYFRAME_VEC')
+        row.operator("forunity.sd_angle_key_range", icon='IPO_EASE_IN_OUT')
 
         # === 6) Naming Tools ===
         box = layout.box()
@@ -898,6 +4638,7 @@ class FORUNITY_PT_main_unified(bpy.types.Panel):
 
         # Prefix/Suffix
         rename_props = scene.batch_rename_props
+        box.prop(rename_props, "target")
         col = box.column(align=True)
         row = col.row(align=True)
         row.prop(rename_props, "mode", expand=True)
@@ -919,6 +4660,27 @@ class FORUNITY_PT_main_unified(bpy.types.Panel):
         row.operator("object.remove_numeric_suffix", icon='X')
         row.operator("object.remove_prefix_until_2nd_hyphen", icon='OUTLINER_DATA_FONT')
 
+        # Regex
+        box.separator()
+        col = box.column(align=True)
+        col.prop(rename_props, "pattern", text="検索")
+        col.prop(rename_props, "replacement", text="置換")
+        col.prop(rename_props, "on_conflict", text="同名")
+        row = col.row(align=True)
+        row.operator("object.regex_rename", text="プレビュー", icon='HIDE_OFF').dry_run = True
+        row.operator("object.regex_rename", text="置換", icon='CHECKMARK').dry_run = False
+        preview = last_rename_preview()
+        if preview:
+            col = box.column(align=True)
+            for old, new in preview["plan"][:RENAME_PREVIEW_ROWS]:
+                col.label(text=f"{old} → {new}")
+            for old, new in preview["skipped"][:RENAME_PREVIEW_ROWS]:
+                col.label(text=f"{old} → {new} (スキップ)", icon='ERROR')
+            rest = (max(len(preview["plan"]) - RENAME_PREVIEW_ROWS, 0)
+                    + max(len(preview["skipped"]) - RENAME_PREVIEW_ROWS, 0))
+            if rest > 0:
+                col.label(text=f"… ほか {rest}個")
+
 # =========================================================
 # Scene Properties
 # =========================================================
@@ -926,6 +4688,14 @@ def register_scene_props():
     # FBX Export
     bpy.types.Scene.forunity_export_animation = bpy.props.BoolProperty(name="Animation", default=True)
     bpy.types.Scene.forunity_export_move_to_origin = bpy.props.BoolProperty(name="原点で書き出す", description="選択中のオブジェクトを一時的に原点へ移動してからFBXを書き出します", default=False)
+    bpy.types.Scene.forunity_export_parallel = bpy.props.BoolProperty(name="並列書き出し", description="スナップショットを保存し、バックグラウンドBlenderで分担して書き出します", default=False)
+    bpy.types.Scene.forunity_export_incremental = bpy.props.BoolProperty(name="変更分のみ書き出し", description="内容のフィンガープリントが前回と同じユニットの書き出しをスキップします", default=False)
+    bpy.types.Scene.forunity_export_native = bpy.props.BoolProperty(name="高速ライター (静的メッシュ)", description="メッシュ/Emptyのみのユニットを内蔵のバイナリFBXライターで書き出します。アーマチュア・アニメーション・シェイプキーを含むユニットは標準エクスポーターを使います", default=False)
+    bpy.types.Scene.forunity_export_native_benchmark = bpy.props.BoolProperty(name="計測", description="高速ライターで書いたユニットを標準エクスポーターでも一時ファイルに書き出し、三角形100万個あたりの所要時間と倍率を報告します", default=False)
+    bpy.types.Scene.forunity_export_group_armature = bpy.props.BoolProperty(name="アーマチュア単位でまとめる", description="同じアーマチュアを親に持つ選択メッシュをアーマチュア名の1つのFBXにまとめ、アクションのベイクを1回で済ませます (Animation有効時)", default=False)
+    bpy.types.Scene.forunity_post_copy = bpy.props.BoolProperty(name="Unityへコピー", description="書き出したFBXをバックグラウンドでアドオン設定のUnityコピー先へコピーします (同じ内容ならスキップ)", default=False)
+    bpy.types.Scene.forunity_post_archive = bpy.props.BoolProperty(name="zipにまとめる", description="書き出したFBXを書き出し先のzipにまとめます", default=False)
+    bpy.types.Scene.forunity_export_report = bpy.props.BoolProperty(name="レポート (JSON/CSV)", description="ユニットごとのフェーズ別時間・頂点/三角形/ボーン/アクション数・ファイルサイズを書き出し先に保存します", default=True)
     bpy.types.Scene.forunity_key_all_bones = bpy.props.BoolProperty(name="Key All Bones", default=True)
     bpy.types.Scene.forunity_nla_strips = bpy.props.BoolProperty(name="NLA Strips", default=True)
     bpy.types.Scene.forunity_all_actions = bpy.props.BoolProperty(name="All Actions", default=True)
@@ -933,6 +4703,8 @@ def register_scene_props():
     bpy.types.Scene.forunity_sampling_rate = bpy.props.FloatProperty(name="Sampling Rate", default=1.0, min=0.01, max=100.0)
     bpy.types.Scene.forunity_simplify = bpy.props.FloatProperty(name="Simplify", default=1.0, min=0.0, max=100.0)
 
+    bpy.types.Scene.forunity_use_job_queue = bpy.props.BoolProperty(name="バックグラウンド実行 (キュー)", description="書き出し・レンダリング・モディファイアベイクをキューに積み、UIを止めずに順番に実行します (Escでキャンセル)", default=False)
+
     # Render
     bpy.types.Scene.forunity_render_filename = bpy.props.StringProperty(name="Render Filename", default="render")
     bpy.types.Scene.forunity_render_directory = bpy.props.StringProperty(name="Render Directory", subtype='DIR_PATH', default="")
@@ -945,12 +4717,21 @@ def register_scene_props():
 def unregister_scene_props():
     del bpy.types.Scene.forunity_export_animation
     del bpy.types.Scene.forunity_export_move_to_origin
+    del bpy.types.Scene.forunity_export_parallel
+    del bpy.types.Scene.forunity_export_incremental
+    del bpy.types.Scene.forunity_export_native
+    del bpy.types.Scene.forunity_export_native_benchmark
+    del bpy.types.Scene.forunity_export_group_armature
+    del bpy.types.Scene.forunity_post_copy
+    del bpy.types.Scene.forunity_post_archive
+    del bpy.types.Scene.forunity_export_report
     del bpy.types.Scene.forunity_key_all_bones
     del bpy.types.Scene.forunity_nla_strips
     del bpy.types.Scene.forunity_all_actions
     del bpy.types.Scene.forunity_force_start_end_keying
     del bpy.types.Scene.forunity_sampling_rate
     del bpy.types.Scene.forunity_simplify
+    del bpy.types.Scene.forunity_use_job_queue
     del bpy.types.Scene.forunity_render_filename
     del bpy.types.Scene.forunity_render_directory
     del bpy.types.Scene.batch_rename_props
@@ -971,6 +4752,11 @@ classes = (
     FORUNITY_OT_tris_to_quads_all,
     # 4) Modifier Bake
     FORUNITY_OT_bake_modifier_to_shapekeys,
+    FORUNITY_OT_bake_modifier_to_vat,
+    FORUNITY_OT_bake_modifier_to_pc2,
+    FORUNITY_OT_load_pc2,
+    FORUNITY_OT_bake_selected_modifiers,
+    FORUNITY_OT_compress_baked_shapekeys,
     FORUNITY_OT_clear_baked_shapekeys,
     # 5) Render
     FORUNITY_OT_set_render_dir,
@@ -978,6 +4764,7 @@ classes = (
     # 6) Simple Deform
     FU_OT_sd_angle_key_current,
     FU_OT_sd_angle_key_set,
+    FU_OT_sd_angle_key_range,
     # 7) Apply Modifiers
     OBJECT_OT_apply_all_modifiers_safe,
     # 8) Naming Tools
@@ -986,6 +4773,9 @@ classes = (
     OBJECT_OT_append_side_suffix,
     OBJECT_OT_remove_numeric_suffix,
     OBJECT_OT_remove_prefix_until_2nd_hyphen,
+    OBJECT_OT_regex_rename,
+    # 9) Job Queue
+    FORUNITY_OT_run_job_queue,
     # Panel (統合版シンプルUI)
     FORUNITY_PT_main_unified,
 )
@@ -994,11 +4784,18 @@ def register():
     for c in classes:
         bpy.utils.register_class(c)
     register_scene_props()
+    bpy.app.handlers.undo_post.append(_on_undo_redo)
+    bpy.app.handlers.redo_post.append(_on_undo_redo)
 
 def unregister():
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if _on_undo_redo in handlers:
+            handlers.remove(_on_undo_redo)
     unregister_scene_props()
     for c in reversed(classes):
         bpy.utils.unregister_class(c)
 
 if __name__ == "__main__":
+    if "--" in sys.argv:
+        sys.exit(cli_main(sys.argv[sys.argv.index("--") + 1:]))
     register()